@@ -11,8 +11,13 @@ class BM25:
         self._doc_len = [len(doc) for doc in corpus]
         self._avgdl = sum(self._doc_len) / max(1, len(self._doc_len))
         self._df: dict[str, int] = {}
+        self._tf: list[dict[str, int]] = []
         for doc in corpus:
-            for token in set(doc):
+            tf: dict[str, int] = {}
+            for token in doc:
+                tf[token] = tf.get(token, 0) + 1
+            self._tf.append(tf)
+            for token in tf:
                 self._df[token] = self._df.get(token, 0) + 1
 
     def score(self, query_tokens: list[str], doc_index: int) -> float:
@@ -21,9 +26,7 @@ class BM25:
         doc = self._corpus[doc_index]
         if not doc:
             return 0.0
-        tf: dict[str, int] = {}
-        for token in doc:
-            tf[token] = tf.get(token, 0) + 1
+        tf = self._tf[doc_index]
         score = 0.0
         doc_len = self._doc_len[doc_index]
         for token in query_tokens:
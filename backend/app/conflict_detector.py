@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+from collections import OrderedDict
 from enum import Enum
 
 from pydantic import BaseModel, Field
@@ -24,12 +26,59 @@ class Conflict(BaseModel):
     suggestion: str | None = None
 
 
+CONFLICT_NODE_FIELDS = ("id", "narrative_order", "timeline_order", "content", "characters")
+
+
+def node_fingerprint(node: StoryNode) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for field in CONFLICT_NODE_FIELDS:
+        digest.update(repr(getattr(node, field)).encode("utf-8"))
+        digest.update(b"|")
+    return digest.digest()
+
+
+def _project_fingerprint(project: StoryProject) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for node in project.nodes:
+        digest.update(node_fingerprint(node))
+    return digest.digest()
+
+
 class ConflictDetector:
+    def __init__(self, cache_size: int = 1024) -> None:
+        self._cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, int, str, bytes], list[Conflict]] = OrderedDict()
+
     async def detect_conflicts(
         self,
         project: StoryProject,
         graph: KnowledgeGraph,
         modified_node: StoryNode,
+        graph_version: int | None = None,
+    ) -> list[Conflict]:
+        if graph_version is None:
+            return await self._detect_conflicts(project, graph)
+
+        key = (project.id, graph_version, modified_node.id, _project_fingerprint(project))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return list(cached)
+
+        conflicts = await self._detect_conflicts(project, graph)
+        self._cache[key] = conflicts
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return list(conflicts)
+
+    def invalidate(self, project_id: str) -> None:
+        for key in [key for key in self._cache if key[0] == project_id]:
+            del self._cache[key]
+
+    async def _detect_conflicts(
+        self,
+        project: StoryProject,
+        graph: KnowledgeGraph,
     ) -> list[Conflict]:
         conflicts: list[Conflict] = []
         conflicts.extend(await self.check_timeline_consistency(project.nodes))
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
+from datetime import datetime
 from typing import Iterable
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .db_models import ProjectTable
 from .models import CharacterProfile, ProjectSummary, StoryNode, StoryProject
 
 
+PROJECT_EXISTS_TTL_SECONDS = 300
+PROJECT_EXISTS_CACHE_SIZE = 1024
+_project_exists_cache: OrderedDict[str, float] = OrderedDict()
+PROJECT_JSON_CACHE_SIZE = 64
+_project_json_cache: OrderedDict[str, tuple[datetime, bytes]] = OrderedDict()
+
+
 def _serialize_project(project: StoryProject) -> dict:
     return {
         "nodes": [node.model_dump() for node in project.nodes],
@@ -16,13 +26,19 @@ def _serialize_project(project: StoryProject) -> dict:
     }
 
 
+def _construct_node(data: dict) -> StoryNode:
+    return StoryNode.model_construct(**data).intern_refs()
+
+
 def _deserialize_project(row: ProjectTable) -> StoryProject:
     data = row.data_json or {}
     nodes_data: Iterable[dict] = data.get("nodes", [])
     characters_data: Iterable[dict] = data.get("characters", [])
-    nodes = [StoryNode(**node) for node in nodes_data]
-    characters = [CharacterProfile(**character) for character in characters_data]
-    return StoryProject(
+    nodes = [_construct_node(node) for node in nodes_data]
+    characters = [
+        CharacterProfile.model_construct(**character) for character in characters_data
+    ]
+    return StoryProject.model_construct(
         id=row.id,
         title=row.title,
         world_view=row.world_view,
@@ -44,6 +60,7 @@ async def create_project(session: AsyncSession, project: StoryProject) -> str:
         created_at=project.created_at,
         updated_at=project.updated_at,
     )
+    _project_json_cache.pop(project.id, None)
     session.add(record)
     await session.commit()
     return record.id
@@ -56,18 +73,92 @@ async def get_project(session: AsyncSession, project_id: str) -> StoryProject |
     return _deserialize_project(record)
 
 
+async def get_project_updated_at(
+    session: AsyncSession, project_id: str
+) -> datetime | None:
+    return await session.scalar(
+        select(ProjectTable.updated_at).where(ProjectTable.id == project_id)
+    )
+
+
+async def get_project_json(session: AsyncSession, project_id: str) -> bytes | None:
+    updated_at = await get_project_updated_at(session, project_id)
+    if updated_at is None:
+        _project_json_cache.pop(project_id, None)
+        return None
+    cached = _project_json_cache.get(project_id)
+    if cached is not None and cached[0] == updated_at:
+        _project_json_cache.move_to_end(project_id)
+        return cached[1]
+    project = await get_project(session, project_id)
+    if project is None:
+        return None
+    content = project.model_dump_json().encode("utf-8")
+    _project_json_cache[project_id] = (project.updated_at, content)
+    _project_json_cache.move_to_end(project_id)
+    while len(_project_json_cache) > PROJECT_JSON_CACHE_SIZE:
+        _project_json_cache.popitem(last=False)
+    return content
+
+
+async def get_project_counts(
+    session: AsyncSession, project_id: str
+) -> tuple[int, int] | None:
+    result = await session.execute(
+        select(
+            func.coalesce(func.json_array_length(ProjectTable.data_json, "$.nodes"), 0),
+            func.coalesce(
+                func.json_array_length(ProjectTable.data_json, "$.characters"), 0
+            ),
+        ).where(ProjectTable.id == project_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return row[0], row[1]
+
+
+async def project_exists(session: AsyncSession, project_id: str) -> bool:
+    expires_at = _project_exists_cache.get(project_id)
+    if expires_at is not None:
+        if expires_at > time.monotonic():
+            _project_exists_cache.move_to_end(project_id)
+            return True
+        _project_exists_cache.pop(project_id, None)
+    result = await session.scalar(
+        select(1).where(ProjectTable.id == project_id).limit(1)
+    )
+    if result is None:
+        return False
+    now = time.monotonic()
+    _project_exists_cache[project_id] = now + PROJECT_EXISTS_TTL_SECONDS
+    _project_exists_cache.move_to_end(project_id)
+    while _project_exists_cache and (
+        len(_project_exists_cache) > PROJECT_EXISTS_CACHE_SIZE
+        or next(iter(_project_exists_cache.values())) <= now
+    ):
+        _project_exists_cache.popitem(last=False)
+    return True
+
+
 async def update_project(
     session: AsyncSession, project_id: str, project: StoryProject
 ) -> StoryProject:
-    record = await session.get(ProjectTable, project_id)
-    if record is None:
+    _project_json_cache.pop(project_id, None)
+    result = await session.execute(
+        update(ProjectTable)
+        .where(ProjectTable.id == project_id)
+        .values(
+            title=project.title,
+            world_view=project.world_view,
+            style_tags=project.style_tags,
+            data_json=_serialize_project(project),
+            updated_at=project.updated_at,
+        )
+    )
+    if (result.rowcount or 0) == 0:
+        await session.rollback()
         raise ValueError("Project not found")
-
-    record.title = project.title
-    record.world_view = project.world_view
-    record.style_tags = project.style_tags
-    record.data_json = _serialize_project(project)
-    record.updated_at = project.updated_at
     await session.commit()
     return project
 
@@ -85,6 +176,8 @@ async def list_projects(session: AsyncSession) -> list[ProjectSummary]:
 
 
 async def delete_project(session: AsyncSession, project_id: str) -> bool:
+    _project_exists_cache.pop(project_id, None)
+    _project_json_cache.pop(project_id, None)
     result = await session.execute(
         delete(ProjectTable).where(ProjectTable.id == project_id)
     )
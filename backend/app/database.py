@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from .db_models import Base
 
@@ -12,13 +15,35 @@ DB_PATH = DATA_DIR / "stories.db"
 
 DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
 
-engine = create_async_engine(DATABASE_URL, future=True)
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 10
+DB_POOL_RECYCLE_SECONDS = 1800
+
+engine = create_async_engine(
+    DATABASE_URL,
+    future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 
 async def init_db() -> None:
     async with engine.begin() as connection:
         await connection.run_sync(Base.metadata.create_all)
+    await warm_pool()
+
+
+async def warm_pool() -> None:
+    async def _checkout() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_checkout() for _ in range(DB_POOL_SIZE)))
 
 
 async def get_session() -> AsyncSession:
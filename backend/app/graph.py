@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
 from datetime import datetime
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+import queue
 from typing import TypedDict
 
 from langchain.prompts import PromptTemplate
@@ -13,7 +17,7 @@ from langgraph.graph import END, START, StateGraph
 from .config import get_api_key, get_base_url, get_model_name, settings
 from .graph_extractor import GraphExtractor
 from .graph_retriever import RetrievalContext, GraphRetriever
-from .knowledge_graph import KnowledgeGraph, load_graph, save_graph
+from .knowledge_graph import KnowledgeGraph, get_project_lock, load_graph, save_graph
 from .models import CreateOutlineRequest, StoryNode, StoryProject, SyncAnalysisResult
 from .node_indexer import NodeIndexer
 from .world_knowledge import WorldKnowledgeManager
@@ -23,10 +27,19 @@ LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "app.log"
 
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(
+    _log_queue,
+    logging.StreamHandler(),
+    logging.FileHandler(LOG_FILE, encoding="utf-8"),
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler(LOG_FILE, encoding="utf-8")],
+    handlers=[QueueHandler(_log_queue)],
 )
 logger = logging.getLogger(__name__)
 
@@ -75,7 +88,7 @@ async def retrieval_node(state: AgentState) -> AgentState:
         if not retrieval_project_id:
             return {**state, "retrieved_context": None, "knowledge_graph": None}
 
-        knowledge_graph = load_graph(retrieval_project_id)
+        knowledge_graph = await asyncio.to_thread(load_graph, retrieval_project_id)
         retriever = GraphRetriever(
             knowledge_graph=knowledge_graph,
             node_indexer=NodeIndexer(),
@@ -111,24 +124,26 @@ async def graph_update_node(state: AgentState) -> AgentState:
 
         extractor = GraphExtractor()
         node_indexer = NodeIndexer()
-        knowledge_graph = state.get("knowledge_graph") or load_graph(project.id)
 
         if state.get("modified_node"):
-            updated_node = next(
-                (node for node in project.nodes if node.id == state["modified_node"].id),
-                state["modified_node"],
-            )
-            updated_graph = await extractor.incremental_update(
-                project_id=project.id,
-                modified_node=updated_node,
-                current_graph=knowledge_graph,
+            updated_node = (
+                project.get_node(state["modified_node"].id) or state["modified_node"]
             )
+            async with get_project_lock(project.id):
+                current_graph = await asyncio.to_thread(load_graph, project.id)
+                updated_graph = await extractor.incremental_update(
+                    project_id=project.id,
+                    modified_node=updated_node,
+                    current_graph=current_graph,
+                )
+                save_graph(updated_graph)
             await node_indexer.index_node(project.id, updated_node)
         else:
             updated_graph = await extractor.build_full_graph(project)
+            async with get_project_lock(project.id):
+                save_graph(updated_graph)
             await node_indexer.index_project(project)
 
-        save_graph(updated_graph)
         print("[graph_update_node] complete")
         return {**state, "knowledge_graph": updated_graph}
     except Exception as exc:
@@ -271,8 +286,7 @@ def apply_sync_node(state: AgentState) -> AgentState:
         except Exception as exc:
             raise ValidationError(f"Apply sync failed: invalid analysis result: {exc}") from exc
 
-        existing_ids = {node.id for node in project.nodes}
-        if modified_node.id in existing_ids:
+        if project.get_node(modified_node.id) is not None:
             project.nodes = [
                 modified_node if node.id == modified_node.id else node for node in project.nodes
             ]
@@ -1,57 +1,71 @@
 from __future__ import annotations
 
-from copy import deepcopy
+from datetime import datetime
 
-from .knowledge_graph import Entity, EntityType, KnowledgeGraph, Relation
+from .knowledge_graph import (
+    Entity,
+    EntityType,
+    GraphDelta,
+    KnowledgeGraph,
+    Relation,
+    utc_now,
+)
 
 
 class GraphEditor:
     def __init__(self, knowledge_graph: KnowledgeGraph):
         self.graph = knowledge_graph
+        self.delta = GraphDelta()
 
     async def update_entity(self, entity_id: str, updates: dict) -> Entity:
-        snapshot = deepcopy(self.graph)
+        entities, relations = self.graph.entities, self.graph.relations
+        last_updated = self.graph.last_updated
         try:
             entity = self._find_entity(entity_id)
             if entity is None:
                 raise ValueError("Entity not found")
             normalized_updates = self._normalize_entity_updates(updates)
+            entity = self._replace_entity(entity)
             for key, value in normalized_updates.items():
                 setattr(entity, key, value)
+            self.delta.entities.append(entity)
             self._touch_graph()
             return entity
         except Exception:
-            self.graph.entities = snapshot.entities
-            self.graph.relations = snapshot.relations
-            self.graph.last_updated = snapshot.last_updated
+            self._rollback(entities, relations, last_updated)
             raise
 
     async def delete_entity(self, entity_id: str) -> dict:
-        snapshot = deepcopy(self.graph)
+        entities, relations = self.graph.entities, self.graph.relations
+        last_updated = self.graph.last_updated
         try:
             entity = self._find_entity(entity_id)
             if entity is None:
                 raise ValueError("Entity not found")
-            before_count = len(self.graph.relations)
-            self.graph.relations = [
-                relation
-                for relation in self.graph.relations
-                if relation.source_id != entity_id and relation.target_id != entity_id
-            ]
-            deleted_relations = before_count - len(self.graph.relations)
-            self.graph.entities = [
-                item for item in self.graph.entities if item.id != entity_id
-            ]
+            attached = self.graph.relations_for(entity_id)
+            if attached:
+                attached_ids = {id(relation) for relation in attached}
+                self.graph.set_items(
+                    relations=[
+                        relation
+                        for relation in self.graph.relations
+                        if id(relation) not in attached_ids
+                    ]
+                )
+                self.delta.removed_relations.extend(relation.id for relation in attached)
+            self.graph.set_items(
+                entities=[item for item in self.graph.entities if item is not entity]
+            )
+            self.delta.removed_entities.append(entity.id)
             self._touch_graph()
-            return {"deleted_relations": deleted_relations}
+            return {"deleted_relations": len(attached)}
         except Exception:
-            self.graph.entities = snapshot.entities
-            self.graph.relations = snapshot.relations
-            self.graph.last_updated = snapshot.last_updated
+            self._rollback(entities, relations, last_updated)
             raise
 
     async def merge_entities(self, from_id: str, into_id: str) -> Entity:
-        snapshot = deepcopy(self.graph)
+        entities, relations = self.graph.entities, self.graph.relations
+        last_updated = self.graph.last_updated
         try:
             if from_id == into_id:
                 raise ValueError("Cannot merge entity into itself")
@@ -61,37 +75,76 @@ class GraphEditor:
             if source is None or target is None:
                 raise ValueError("Entity not found")
 
+            target_relations = list(self.graph.relations_for(target.id))
+            moved: dict[int, Relation] = {}
+            for relation in self.graph.relations_for(source.id):
+                updated = relation.model_copy(deep=True)
+                if updated.source_id == source.id:
+                    updated.source_id = target.id
+                if updated.target_id == source.id:
+                    updated.target_id = target.id
+                moved[id(relation)] = updated
+
+            target = self._replace_entity(target)
             merged_aliases = set(target.aliases)
             merged_aliases.add(source.name)
             merged_aliases.update(source.aliases)
             merged_aliases.discard(target.name)
             target.aliases = list(merged_aliases)
-
-            for relation in self.graph.relations:
-                if relation.source_id == source.id:
-                    relation.source_id = target.id
-                if relation.target_id == source.id:
-                    relation.target_id = target.id
-
             target.source_refs = list(set(target.source_refs + source.source_refs))
-            self.graph.entities = [
-                entity for entity in self.graph.entities if entity.id != source.id
-            ]
+            self.graph.set_items(
+                entities=[
+                    entity for entity in self.graph.entities if entity.id != source.id
+                ]
+            )
+
+            if moved:
+                self.graph.set_items(
+                    relations=[
+                        moved.get(id(relation), relation)
+                        for relation in self.graph.relations
+                    ]
+                )
+            dropped = self._dedupe_relations(
+                [relation for relation in target_relations if id(relation) not in moved]
+                + list(moved.values())
+            )
 
-            self._dedupe_relations()
+            self.delta.entities.append(target)
+            self.delta.removed_entities.append(source.id)
+            self.delta.relations.extend(
+                relation for relation in moved.values() if id(relation) not in dropped
+            )
+            self.delta.removed_relations.extend(
+                relation.id
+                for relation in [*target_relations, *moved.values()]
+                if id(relation) in dropped
+            )
             self._touch_graph()
             return target
         except Exception:
-            self.graph.entities = snapshot.entities
-            self.graph.relations = snapshot.relations
-            self.graph.last_updated = snapshot.last_updated
+            self._rollback(entities, relations, last_updated)
             raise
 
+    def _replace_entity(self, entity: Entity) -> Entity:
+        updated = entity.model_copy(deep=True)
+        self.graph.set_items(
+            entities=[updated if item is entity else item for item in self.graph.entities]
+        )
+        return updated
+
+    def _rollback(
+        self,
+        entities: list[Entity],
+        relations: list[Relation],
+        last_updated: datetime,
+    ) -> None:
+        self.graph.set_items(entities, relations)
+        self.graph.last_updated = last_updated
+        self.delta = GraphDelta()
+
     def _find_entity(self, entity_id: str) -> Entity | None:
-        for entity in self.graph.entities:
-            if entity.id == entity_id:
-                return entity
-        return None
+        return self.graph.get_entity(entity_id)
 
     def _normalize_entity_updates(self, updates: dict) -> dict:
         allowed_fields = {
@@ -133,17 +186,12 @@ class GraphEditor:
                 continue
         return normalized
 
-    def _dedupe_relations(self) -> None:
+    def _dedupe_relations(self, candidates: list[Relation]) -> set[int]:
         unique: dict[tuple[str, str, str, str], Relation] = {}
-        for relation in self.graph.relations:
-            relation_type = (
-                relation.relation_type.value
-                if hasattr(relation.relation_type, "value")
-                else str(relation.relation_type)
-            )
+        for relation in candidates:
             key = tuple(
                 sorted([relation.source_id, relation.target_id])
-                + [relation_type, relation.relation_name]
+                + [relation.relation_type.value, relation.relation_name]
             )
             existing = unique.get(key)
             if not existing:
@@ -151,7 +199,17 @@ class GraphEditor:
                 continue
             keep = self._pick_relation(existing, relation)
             unique[key] = keep
-        self.graph.relations = list(unique.values())
+        kept = {id(relation) for relation in unique.values()}
+        dropped = {id(relation) for relation in candidates if id(relation) not in kept}
+        if dropped:
+            self.graph.set_items(
+                relations=[
+                    relation
+                    for relation in self.graph.relations
+                    if id(relation) not in dropped
+                ]
+            )
+        return dropped
 
     def _pick_relation(self, first: Relation, second: Relation) -> Relation:
         first_score = self._relation_score(first)
@@ -168,6 +226,4 @@ class GraphEditor:
         return weight * 1000 + description_score
 
     def _touch_graph(self) -> None:
-        from datetime import datetime
-
-        self.graph.last_updated = datetime.utcnow()
+        self.graph.last_updated = utc_now()
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import asyncio
 import json
-from datetime import datetime
 from pathlib import Path
 from typing import Iterable
 from uuid import uuid4
@@ -12,7 +11,7 @@ from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
 from .config import get_api_key, get_base_url, get_model_name
-from .knowledge_graph import Entity, KnowledgeGraph, Relation
+from .knowledge_graph import Entity, KnowledgeGraph, Relation, utc_now
 from .models import StoryNode, StoryProject
 
 
@@ -115,8 +114,7 @@ class GraphExtractor:
 
         for node in project.nodes:
             result = await self.extract_from_node(node, graph)
-            graph.entities.extend(result.new_entities)
-            graph.relations.extend(result.new_relations)
+            graph.add_items(result.new_entities, result.new_relations)
         graph.last_updated = project.updated_at
         return graph
 
@@ -133,7 +131,6 @@ class GraphExtractor:
             last_updated=current_graph.last_updated,
         )
         result = await self.extract_from_node(modified_node, updated_graph)
-        updated_graph.entities.extend(result.new_entities)
-        updated_graph.relations.extend(result.new_relations)
-        updated_graph.last_updated = datetime.utcnow()
+        updated_graph.add_items(result.new_entities, result.new_relations)
+        updated_graph.last_updated = utc_now()
         return updated_graph
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from collections import deque
 from dataclasses import dataclass
 
@@ -144,34 +145,30 @@ class GraphRetriever:
         base_tokens = tokenize(query)
 
         node_scores: dict[str, dict] = {}
-        for q in queries:
-            vector_nodes = await self._node_indexer.search_related_nodes_with_scores(
-                project_id=project_id,
-                query=q,
-                top_k=8,
+        hybrid_results = await asyncio.gather(
+            *(
+                self._node_indexer.search_hybrid(
+                    project_id=project_id,
+                    query=q,
+                    top_k=8,
+                    keyword_top_k=6,
+                )
+                for q in queries
             )
+        )
+        for vector_nodes, keyword_nodes, bm25_nodes in hybrid_results:
             for node, score in vector_nodes:
                 entry = node_scores.setdefault(
                     node.id, {"node": node, "vector": 0.0, "keyword": 0.0}
                 )
                 entry["vector"] = max(entry["vector"], float(score))
 
-            keyword_nodes = await self._node_indexer.search_keyword_nodes(
-                project_id=project_id,
-                query=q,
-                top_k=6,
-            )
             for node, score in keyword_nodes:
                 entry = node_scores.setdefault(
                     node.id, {"node": node, "vector": 0.0, "keyword": 0.0}
                 )
                 entry["keyword"] = max(entry["keyword"], float(score))
 
-            bm25_nodes = await self._node_indexer.search_bm25_nodes(
-                project_id=project_id,
-                query=q,
-                top_k=6,
-            )
             for node, score in bm25_nodes:
                 entry = node_scores.setdefault(
                     node.id, {"node": node, "vector": 0.0, "keyword": 0.0, "bm25": 0.0}
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import difflib
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from multiprocessing import get_context
 from typing import Iterable
 
 from pydantic import BaseModel, Field
@@ -10,6 +16,7 @@ from .graph_extractor import GraphExtractor
 from .knowledge_graph import Entity, KnowledgeGraph, Relation
 from .models import StoryNode, StoryProject
 from .node_indexer import NodeIndexer
+from .text_utils import node_text
 from .world_knowledge import WorldKnowledgeManager
 
 
@@ -32,6 +39,56 @@ class _GraphDiff:
     removed_relations: list[str]
 
 
+_ENTITY_IDENTITY_FIELDS = ("id", "name", "type", "aliases")
+_RELATION_IDENTITY_FIELDS = ("id", "source_id", "target_id", "relation_type", "relation_name")
+
+
+def _canonical(item: Entity | Relation, fields: tuple[str, ...]) -> tuple:
+    values = []
+    for field in fields:
+        value = getattr(item, field)
+        if isinstance(value, list):
+            value = tuple(sorted(value))
+        values.append(value)
+    return tuple(values)
+
+
+_CPU_OFFLOAD_MIN_CHARS = 4096
+_NGRAM_SIZE = 5
+_NGRAM_SAME_THRESHOLD = 0.97
+_NGRAM_DIFFERENT_THRESHOLD = 0.80
+
+
+def _ngram_set(text: str, size: int = _NGRAM_SIZE) -> frozenset[str]:
+    return frozenset(text[index : index + size] for index in range(len(text) - size + 1))
+
+
+def _text_similarity(old_text: str, new_text: str) -> float:
+    if old_text == new_text:
+        return 1.0
+    old_ngrams = _ngram_set(old_text)
+    new_ngrams = _ngram_set(new_text)
+    if old_ngrams and new_ngrams:
+        jaccard = len(old_ngrams & new_ngrams) / len(old_ngrams | new_ngrams)
+        if jaccard >= _NGRAM_SAME_THRESHOLD:
+            return 1.0
+        if jaccard <= _NGRAM_DIFFERENT_THRESHOLD:
+            return 0.0
+    return difflib.SequenceMatcher(None, old_text, new_text).ratio()
+
+
+def _match_mentions(
+    text: str,
+    candidates: tuple[tuple[str, tuple[str, ...]], ...],
+) -> set[str]:
+    lowered = text.lower()
+    return {
+        entity_id
+        for entity_id, names in candidates
+        if any(name in lowered for name in names)
+    }
+
+
 class IndexSyncManager:
     def __init__(
         self,
@@ -42,6 +99,21 @@ class IndexSyncManager:
         self.node_indexer = node_indexer
         self.graph_extractor = graph_extractor
         self.knowledge_manager = knowledge_manager
+        self._cpu_workers = os.cpu_count() or 1
+        self._cpu_pool: ProcessPoolExecutor | None = None
+        self._cpu_slots = asyncio.Semaphore(self._cpu_workers)
+
+    def _get_cpu_pool(self) -> ProcessPoolExecutor:
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self._cpu_workers, mp_context=get_context("spawn")
+            )
+        return self._cpu_pool
+
+    def shutdown(self) -> None:
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(cancel_futures=True)
+            self._cpu_pool = None
 
     async def sync_node_update(
         self,
@@ -49,19 +121,67 @@ class IndexSyncManager:
         old_node: StoryNode | None,
         new_node: StoryNode,
         current_graph: KnowledgeGraph,
+        index_vector: bool = True,
     ) -> SyncResult:
-        result = SyncResult(success=True, vector_updated=False, graph_updated=False)
+        if index_vector:
+            await self.node_indexer.index_node(project_id, new_node)
+        result, updated_graph = await self._extract_node_update(
+            project_id, old_node, new_node, current_graph
+        )
+        if updated_graph is not None:
+            current_graph.set_items(updated_graph.entities, updated_graph.relations)
+            current_graph.last_updated = updated_graph.last_updated
+        return result
 
-        await self.node_indexer.index_node(project_id, new_node)
-        result.vector_updated = True
+    async def sync_node_updates(
+        self,
+        project_id: str,
+        updates: list[tuple[StoryNode | None, StoryNode]],
+        current_graph: KnowledgeGraph,
+    ) -> list[SyncResult]:
+        extracted = await asyncio.gather(
+            *(
+                self._extract_node_update(project_id, old_node, new_node, current_graph)
+                for old_node, new_node in updates
+            )
+        )
+        updated_graphs = [
+            updated_graph for _result, updated_graph in extracted if updated_graph is not None
+        ]
+        if updated_graphs:
+            new_entities: dict[str, Entity] = {}
+            new_relations: dict[str, Relation] = {}
+            for result, _updated_graph in extracted:
+                for entity in result.new_entities:
+                    new_entities.setdefault(entity.id, entity)
+                for relation in result.new_relations:
+                    new_relations.setdefault(relation.id, relation)
+            self._merge_new_items(
+                current_graph,
+                new_entities,
+                new_relations,
+                max(updated_graph.last_updated for updated_graph in updated_graphs),
+            )
+        return [result for result, _updated_graph in extracted]
+
+    async def _extract_node_update(
+        self,
+        project_id: str,
+        old_node: StoryNode | None,
+        new_node: StoryNode,
+        current_graph: KnowledgeGraph,
+    ) -> tuple[SyncResult, KnowledgeGraph | None]:
+        result = SyncResult.model_construct(
+            success=True, vector_updated=True, graph_updated=False
+        )
 
         if old_node:
-            similarity = self._calculate_similarity(
+            similarity = await self._similarity(
                 self._node_text(old_node),
                 self._node_text(new_node),
             )
             if similarity > 0.95:
-                return result
+                return result, None
 
         updated_graph = await self.graph_extractor.incremental_update(
             project_id=project_id,
@@ -71,27 +191,23 @@ class IndexSyncManager:
 
         removed_entities: set[str] = set()
         if old_node:
-            old_mentions = self._extract_entity_mentions(old_node.content, current_graph)
-            new_mentions = self._extract_entity_mentions(new_node.content, current_graph)
+            old_mentions, new_mentions = await asyncio.gather(
+                self._extract_entity_mentions(old_node.content, current_graph),
+                self._extract_entity_mentions(new_node.content, current_graph),
+            )
             removed_entities = old_mentions - new_mentions
 
         diff = self._diff_graphs(current_graph, updated_graph)
         if removed_entities:
-            diff.removed_entities.extend(
-                entity_id
-                for entity_id in removed_entities
-                if entity_id not in diff.removed_entities
-            )
+            known_removed = set(diff.removed_entities)
+            diff.removed_entities.extend(removed_entities - known_removed)
 
         result.new_entities = diff.new_entities
         result.new_relations = diff.new_relations
         result.removed_entities = diff.removed_entities
         result.removed_relations = diff.removed_relations
         result.graph_updated = True
-        current_graph.entities = updated_graph.entities
-        current_graph.relations = updated_graph.relations
-        current_graph.last_updated = updated_graph.last_updated
-        return result
+        return result, updated_graph
 
     async def sync_node_create(
         self,
@@ -112,27 +228,34 @@ class IndexSyncManager:
         node_id: str,
         current_graph: KnowledgeGraph,
     ) -> SyncResult:
-        result = SyncResult(success=True, vector_updated=False, graph_updated=False)
+        result = SyncResult.model_construct(
+            success=True, vector_updated=False, graph_updated=False
+        )
 
         await self.node_indexer.remove_node(project_id, node_id)
         result.vector_updated = True
 
         removed_entities: list[str] = []
         removed_relations: list[str] = []
-        for entity in list(current_graph.entities):
+        kept_entities: list[Entity] = []
+        kept_relations: list[Relation] = []
+        for entity in current_graph.entities:
             if node_id in entity.source_refs:
                 entity.source_refs = [ref for ref in entity.source_refs if ref != node_id]
                 if not entity.source_refs:
                     removed_entities.append(entity.id)
-                    current_graph.entities.remove(entity)
-        for relation in list(current_graph.relations):
+                    continue
+            kept_entities.append(entity)
+        for relation in current_graph.relations:
             if node_id in relation.source_refs:
                 relation.source_refs = [
                     ref for ref in relation.source_refs if ref != node_id
                 ]
                 if not relation.source_refs:
                     removed_relations.append(relation.id)
-                    current_graph.relations.remove(relation)
+                    continue
+            kept_relations.append(relation)
+        current_graph.set_items(kept_entities, kept_relations)
 
         result.removed_entities = removed_entities
         result.removed_relations = removed_relations
@@ -143,7 +266,9 @@ class IndexSyncManager:
         self,
         project: StoryProject,
     ) -> SyncResult:
-        result = SyncResult(success=True, vector_updated=False, graph_updated=False)
+        result = SyncResult.model_construct(
+            success=True, vector_updated=False, graph_updated=False
+        )
         indexed = await self.node_indexer.index_project(project)
         result.vector_updated = indexed > 0
 
@@ -159,70 +284,124 @@ class IndexSyncManager:
         updates: list[tuple[StoryNode | None, StoryNode]],
         current_graph: KnowledgeGraph,
     ) -> SyncResult:
-        result = SyncResult(success=True, vector_updated=False, graph_updated=False)
+        result = SyncResult.model_construct(
+            success=True, vector_updated=False, graph_updated=False
+        )
 
-        significant_updates: list[StoryNode] = []
+        latest_updates: dict[str, tuple[StoryNode | None, StoryNode]] = {}
         for old_node, new_node in updates:
-            await self.node_indexer.index_node(project_id, new_node)
-            result.vector_updated = True
+            previous = latest_updates.get(new_node.id)
+            if previous is not None:
+                old_node = previous[0]
+            latest_updates[new_node.id] = (old_node, new_node)
+
+        to_index = [new_node for _old_node, new_node in latest_updates.values()]
+        indexed = await self.node_indexer.batch_index_nodes(project_id, to_index)
+        result.vector_updated = indexed > 0
+
+        significant_updates: list[StoryNode] = []
+        compared: list[tuple[StoryNode, StoryNode]] = []
+        for old_node, new_node in latest_updates.values():
             if old_node is None:
                 significant_updates.append(new_node)
-                continue
-            similarity = self._calculate_similarity(
-                self._node_text(old_node),
-                self._node_text(new_node),
+            else:
+                compared.append((old_node, new_node))
+
+        similarities = await asyncio.gather(
+            *(
+                self._similarity(self._node_text(old_node), self._node_text(new_node))
+                for old_node, new_node in compared
             )
-            if similarity <= 0.95:
-                significant_updates.append(new_node)
+        )
+        significant_updates.extend(
+            new_node
+            for (_old_node, new_node), similarity in zip(compared, similarities)
+            if similarity <= 0.95
+        )
 
-        graph = current_graph
-        all_new_entities: list[Entity] = []
-        all_new_relations: list[Relation] = []
-        for node in significant_updates:
-            updated_graph = await self.graph_extractor.incremental_update(
-                project_id=project_id,
-                modified_node=node,
-                current_graph=graph,
+        if not significant_updates:
+            return result
+
+        updated_graphs = await asyncio.gather(
+            *(
+                self.graph_extractor.incremental_update(
+                    project_id=project_id,
+                    modified_node=node,
+                    current_graph=current_graph,
+                )
+                for node in significant_updates
+            )
+        )
+        diffs = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._diff_graphs, current_graph, updated_graph)
+                for updated_graph in updated_graphs
             )
-            diff = self._diff_graphs(graph, updated_graph)
-            all_new_entities.extend(diff.new_entities)
-            all_new_relations.extend(diff.new_relations)
-            graph = updated_graph
-
-        if significant_updates:
-            result.new_entities = all_new_entities
-            result.new_relations = all_new_relations
-            result.graph_updated = True
-            current_graph.entities = graph.entities
-            current_graph.relations = graph.relations
-            current_graph.last_updated = graph.last_updated
+        )
 
+        new_entities: dict[str, Entity] = {}
+        new_relations: dict[str, Relation] = {}
+        for diff in diffs:
+            for entity in diff.new_entities:
+                new_entities.setdefault(entity.id, entity)
+            for relation in diff.new_relations:
+                new_relations.setdefault(relation.id, relation)
+
+        result.new_entities = list(new_entities.values())
+        result.new_relations = list(new_relations.values())
+        result.graph_updated = True
+        self._merge_new_items(
+            current_graph,
+            new_entities,
+            new_relations,
+            max(updated_graph.last_updated for updated_graph in updated_graphs),
+        )
         return result
 
-    def _calculate_similarity(self, old_text: str, new_text: str) -> float:
-        return difflib.SequenceMatcher(None, old_text, new_text).ratio()
+    def _merge_new_items(
+        self,
+        current_graph: KnowledgeGraph,
+        new_entities: dict[str, Entity],
+        new_relations: dict[str, Relation],
+        last_updated: datetime,
+    ) -> None:
+        entities = {entity.id: entity for entity in current_graph.entities}
+        relations = {relation.id: relation for relation in current_graph.relations}
+        current_graph.set_items(
+            list((entities | new_entities).values()),
+            list((relations | new_relations).values()),
+        )
+        current_graph.last_updated = last_updated
+
+    async def _run_cpu_bound(self, size: int, func, *args):
+        if size < _CPU_OFFLOAD_MIN_CHARS:
+            return func(*args)
+        async with self._cpu_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_cpu_pool(), partial(func, *args))
+
+    async def _similarity(self, old_text: str, new_text: str) -> float:
+        return await self._run_cpu_bound(
+            len(old_text) + len(new_text), _text_similarity, old_text, new_text
+        )
 
     @staticmethod
     def _node_text(node: StoryNode) -> str:
-        parts = [node.title.strip(), node.content.strip()]
-        return "\n\n".join(part for part in parts if part)
+        return node_text(node)
 
-    def _extract_entity_mentions(
+    async def _extract_entity_mentions(
         self,
         text: str,
         graph: KnowledgeGraph,
     ) -> set[str]:
-        lowered = text.lower()
-        mentioned: set[str] = set()
-        for entity in graph.entities:
-            if entity.name.lower() in lowered:
-                mentioned.add(entity.id)
-                continue
-            for alias in entity.aliases:
-                if alias.lower() in lowered:
-                    mentioned.add(entity.id)
-                    break
-        return mentioned
+        candidates = tuple(
+            (
+                entity.id,
+                (entity.name.lower(), *(alias.lower() for alias in entity.aliases)),
+            )
+            for entity in graph.entities
+        )
+        return await self._run_cpu_bound(len(text), _match_mentions, text, candidates)
 
     def _diff_graphs(
         self,
@@ -235,12 +414,18 @@ class IndexSyncManager:
         after_relations = {relation.id: relation for relation in after.relations}
 
         new_entities = [
-            entity for entity_id, entity in after_entities.items() if entity_id not in before_entities
+            entity
+            for entity_id, entity in after_entities.items()
+            if entity_id not in before_entities
+            or _canonical(entity, _ENTITY_IDENTITY_FIELDS)
+            != _canonical(before_entities[entity_id], _ENTITY_IDENTITY_FIELDS)
         ]
         new_relations = [
             relation
             for relation_id, relation in after_relations.items()
             if relation_id not in before_relations
+            or _canonical(relation, _RELATION_IDENTITY_FIELDS)
+            != _canonical(before_relations[relation_id], _RELATION_IDENTITY_FIELDS)
         ]
         removed_entities = [
             entity_id for entity_id in before_entities if entity_id not in after_entities
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime
+import asyncio
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
+from typing import Iterable
 from uuid import uuid4
 
-from pydantic import BaseModel, Field
+import orjson
+import ormsgpack
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class EntityType(str, Enum):
@@ -58,6 +67,57 @@ class KnowledgeGraph(BaseModel):
     relations: list[Relation]
     last_updated: datetime
 
+    _entities_by_id: dict[str, Entity] | None = PrivateAttr(default=None)
+    _relations_by_endpoint: dict[str, list[Relation]] | None = PrivateAttr(default=None)
+
+    def __deepcopy__(self, memo: dict | None = None) -> KnowledgeGraph:
+        copied = super().__deepcopy__(memo)
+        copied._invalidate_indexes()
+        return copied
+
+    def set_items(
+        self,
+        entities: list[Entity] | None = None,
+        relations: list[Relation] | None = None,
+    ) -> None:
+        if entities is not None:
+            self.entities = entities
+        if relations is not None:
+            self.relations = relations
+        self._invalidate_indexes()
+
+    def add_items(
+        self,
+        entities: Iterable[Entity] = (),
+        relations: Iterable[Relation] = (),
+    ) -> None:
+        self.entities.extend(entities)
+        self.relations.extend(relations)
+        self._invalidate_indexes()
+
+    def _invalidate_indexes(self) -> None:
+        self._entities_by_id = None
+        self._relations_by_endpoint = None
+
+    def get_entity(self, entity_id: str) -> Entity | None:
+        if self._entities_by_id is None:
+            self._entities_by_id = {entity.id: entity for entity in self.entities}
+        return self._entities_by_id.get(entity_id)
+
+    def relations_for(self, entity_id: str) -> list[Relation]:
+        if self._relations_by_endpoint is None:
+            by_endpoint: dict[str, list[Relation]] = {}
+            for relation in self.relations:
+                by_endpoint.setdefault(relation.source_id, []).append(relation)
+                if relation.target_id != relation.source_id:
+                    by_endpoint.setdefault(relation.target_id, []).append(relation)
+            self._relations_by_endpoint = by_endpoint
+        return self._relations_by_endpoint.get(entity_id, [])
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
 
 def _storage_dir() -> Path:
     directory = Path(__file__).resolve().parent.parent / "data" / "knowledge_graph"
@@ -66,35 +126,348 @@ def _storage_dir() -> Path:
 
 
 def _graph_file(project_id: str) -> Path:
+    return _storage_dir() / f"{project_id}.kg"
+
+
+def _legacy_graph_file(project_id: str) -> Path:
     return _storage_dir() / f"{project_id}.json"
 
 
-def load_graph(project_id: str) -> KnowledgeGraph:
-    path = _graph_file(project_id)
-    if not path.exists():
-        return KnowledgeGraph(
+def _journal_file(project_id: str) -> Path:
+    return _storage_dir() / f"{project_id}.kg.log"
+
+
+_GRAPH_FILE_MAGIC = b"KG\x01"
+_GRAPH_COMPRESSION_LEVEL = 1
+
+
+_GRAPH_CACHE_SIZE = 128
+GRAPH_FLUSH_DELAY_SECONDS = 0.1
+_graph_cache: OrderedDict[str, KnowledgeGraph] = OrderedDict()
+_dirty_graphs: set[str] = set()
+_evicted_graphs: dict[str, KnowledgeGraph] = {}
+_graph_versions: dict[str, int] = {}
+_graph_mtimes: dict[str, int | None] = {}
+_journal_seqs: dict[str, int] = {}
+_journal_pending: dict[str, int] = {}
+_graph_generations: dict[str, int] = {}
+_cache_lock = threading.Lock()
+_journal_lock = threading.Lock()
+_graph_file_lock = threading.Lock()
+GRAPH_JOURNAL_COMPACT_EVERY = 64
+_flush_task: asyncio.Task | None = None
+_flush_loop: asyncio.AbstractEventLoop | None = None
+_flush_lock = asyncio.Lock()
+_project_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+def get_project_lock(project_id: str) -> asyncio.Lock:
+    return _project_locks[project_id]
+
+
+def _file_mtime(project_id: str) -> int | None:
+    for path in (_graph_file(project_id), _legacy_graph_file(project_id)):
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return None
+
+
+@dataclass
+class GraphDelta:
+    entities: list[Entity] = field(default_factory=list)
+    removed_entities: list[str] = field(default_factory=list)
+    relations: list[Relation] = field(default_factory=list)
+    removed_relations: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.entities or self.removed_entities or self.relations or self.removed_relations
+        )
+
+
+def _apply_journal_record(graph: KnowledgeGraph, record: dict) -> None:
+    removed_entities = set(record["removed_entities"])
+    entities = {
+        entity.id: entity
+        for entity in graph.entities
+        if entity.id not in removed_entities
+    }
+    for item in record["entities"]:
+        entities[item["id"]] = Entity.model_validate(item)
+    removed_relations = set(record["removed_relations"])
+    relations = {
+        relation.id: relation
+        for relation in graph.relations
+        if relation.id not in removed_relations
+    }
+    for item in record["relations"]:
+        relations[item["id"]] = Relation.model_validate(item)
+    graph.set_items(list(entities.values()), list(relations.values()))
+    graph.last_updated = datetime.fromisoformat(record["last_updated"])
+
+
+def _decode_graph(raw: bytes) -> tuple[dict, int]:
+    if raw.startswith(_GRAPH_FILE_MAGIC):
+        payload = ormsgpack.unpackb(zlib.decompress(raw[len(_GRAPH_FILE_MAGIC) :]))
+        return payload, payload.pop("journal_seq", 0)
+    return orjson.loads(raw), 0
+
+
+def _encode_graph(graph: KnowledgeGraph, journal_seq: int) -> bytes:
+    payload = ormsgpack.packb({**graph.model_dump(mode="json"), "journal_seq": journal_seq})
+    return _GRAPH_FILE_MAGIC + zlib.compress(payload, _GRAPH_COMPRESSION_LEVEL)
+
+
+def _read_journal(project_id: str, after_seq: int) -> list[dict]:
+    path = _journal_file(project_id)
+    with _journal_lock:
+        if not path.exists():
+            return []
+        lines = path.read_bytes().splitlines()
+    records = [orjson.loads(line) for line in lines if line]
+    return sorted(
+        (record for record in records if record["seq"] > after_seq),
+        key=lambda record: record["seq"],
+    )
+
+
+def _append_journal(project_id: str, record: dict) -> None:
+    line = orjson.dumps(record) + b"\n"
+    with _journal_lock:
+        fd = os.open(_journal_file(project_id), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+def _compact_journal(project_id: str, journal_seq: int) -> None:
+    path = _journal_file(project_id)
+    with _journal_lock:
+        if not path.exists():
+            return
+        kept = [
+            line
+            for line in path.read_bytes().splitlines()
+            if line and orjson.loads(line)["seq"] > journal_seq
+        ]
+        if kept:
+            _write_atomic(path, b"\n".join(kept) + b"\n")
+        else:
+            path.unlink()
+
+
+def _read_graph(project_id: str) -> tuple[KnowledgeGraph, int]:
+    graph = None
+    journal_seq = 0
+    for path in (_graph_file(project_id), _legacy_graph_file(project_id)):
+        if path.exists():
+            payload, journal_seq = _decode_graph(path.read_bytes())
+            graph = KnowledgeGraph.model_validate(payload)
+            break
+    if graph is None:
+        graph = KnowledgeGraph(
             project_id=project_id,
             entities=[],
             relations=[],
-            last_updated=datetime.utcnow(),
+            last_updated=utc_now(),
         )
-    payload = json.loads(path.read_text(encoding="utf-8"))
-    return KnowledgeGraph.model_validate(payload)
+    for record in _read_journal(project_id, journal_seq):
+        _apply_journal_record(graph, record)
+        journal_seq = record["seq"]
+    return graph, journal_seq
 
 
-def save_graph(graph: KnowledgeGraph) -> None:
-    graph.last_updated = datetime.utcnow()
-    path = _graph_file(graph.project_id)
-    payload = graph.model_dump(mode="json")
-    path.write_text(
-        json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp"
     )
+    try:
+        try:
+            os.fchmod(fd, 0o644)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
 
 
-def delete_graph(project_id: str) -> None:
+def _write_graph(
+    graph: KnowledgeGraph, journal_seq: int, generation: int | None = None
+) -> None:
+    project_id = graph.project_id
     path = _graph_file(project_id)
-    if path.exists():
-        path.unlink()
+    with _graph_file_lock:
+        with _cache_lock:
+            if generation is not None and generation != _graph_generations.get(project_id, 0):
+                return
+        _write_atomic(path, _encode_graph(graph, journal_seq))
+        _legacy_graph_file(project_id).unlink(missing_ok=True)
+        _compact_journal(project_id, journal_seq)
+        mtime = path.stat().st_mtime_ns
+        with _cache_lock:
+            if project_id in _graph_cache:
+                _graph_mtimes[project_id] = mtime
+
+
+def _cached_graph(project_id: str) -> KnowledgeGraph | None:
+    graph = _graph_cache.get(project_id)
+    if graph is None:
+        graph = _evicted_graphs.get(project_id)
+    return graph
+
+
+def _cache_graph(graph: KnowledgeGraph) -> None:
+    _graph_cache[graph.project_id] = graph
+    _graph_cache.move_to_end(graph.project_id)
+    _evicted_graphs.pop(graph.project_id, None)
+    while len(_graph_cache) > _GRAPH_CACHE_SIZE:
+        evicted_id, evicted = _graph_cache.popitem(last=False)
+        _graph_mtimes.pop(evicted_id, None)
+        if evicted_id in _dirty_graphs:
+            _evicted_graphs[evicted_id] = evicted
+
+
+def _take_dirty_graph() -> tuple[KnowledgeGraph, int, int] | None:
+    with _cache_lock:
+        while _dirty_graphs:
+            project_id = _dirty_graphs.pop()
+            graph = _cached_graph(project_id)
+            _evicted_graphs.pop(project_id, None)
+            if graph is not None:
+                _journal_pending.pop(project_id, None)
+                return (
+                    graph.model_copy(deep=True),
+                    _journal_seqs.get(project_id, 0),
+                    _graph_generations.get(project_id, 0),
+                )
+        return None
+
+
+def _schedule_flush() -> None:
+    global _flush_task, _flush_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if _flush_loop is not None and _flush_loop.is_running():
+            _flush_loop.call_soon_threadsafe(_schedule_flush)
+            return
+        while (dirty := _take_dirty_graph()) is not None:
+            _write_graph(*dirty)
+        return
+    _flush_loop = loop
+    if _flush_task is None or _flush_task.done():
+        _flush_task = loop.create_task(_flush_graphs_later())
+
+
+def graph_version(project_id: str) -> int:
+    return _graph_versions.get(project_id, 0)
+
+
+def _bump_graph_version(project_id: str) -> None:
+    _graph_versions[project_id] = _graph_versions.get(project_id, 0) + 1
+
+
+def load_graph(project_id: str, copy: bool = True) -> KnowledgeGraph:
+    mtime = _file_mtime(project_id)
+    with _cache_lock:
+        cached = _cached_graph(project_id)
+        if cached is not None and (
+            project_id in _dirty_graphs or _graph_mtimes.get(project_id) == mtime
+        ):
+            if project_id in _graph_cache:
+                _graph_cache.move_to_end(project_id)
+            return cached.model_copy(deep=True) if copy else cached
+    graph, journal_seq = _read_graph(project_id)
+    with _cache_lock:
+        cached = _cached_graph(project_id)
+        if cached is not None and (
+            project_id in _dirty_graphs
+            or journal_seq < _journal_seqs.get(project_id, 0)
+        ):
+            graph = cached
+        else:
+            _cache_graph(graph)
+            _graph_mtimes[project_id] = mtime
+            _journal_seqs[project_id] = journal_seq
+            _bump_graph_version(project_id)
+    if _evicted_graphs:
+        _schedule_flush()
+    return graph.model_copy(deep=True) if copy else graph
+
+
+def save_graph(graph: KnowledgeGraph) -> None:
+    graph.last_updated = utc_now()
+    with _cache_lock:
+        _cache_graph(graph.model_copy(deep=True))
+        _dirty_graphs.add(graph.project_id)
+        _bump_graph_version(graph.project_id)
+    _schedule_flush()
+
+
+def save_graph_delta(graph: KnowledgeGraph, delta: GraphDelta) -> dict:
+    graph.last_updated = utc_now()
+    project_id = graph.project_id
+    with _cache_lock:
+        _cache_graph(graph)
+        _bump_graph_version(project_id)
+        journal_seq = _journal_seqs.get(project_id, 0) + 1
+        _journal_seqs[project_id] = journal_seq
+        pending = _journal_pending.get(project_id, 0) + 1
+        _journal_pending[project_id] = pending
+        if pending >= GRAPH_JOURNAL_COMPACT_EVERY:
+            _dirty_graphs.add(project_id)
+    if _evicted_graphs:
+        _schedule_flush()
+    return {
+        "seq": journal_seq,
+        "last_updated": graph.last_updated.isoformat(),
+        "entities": [entity.model_dump(mode="json") for entity in delta.entities],
+        "removed_entities": delta.removed_entities,
+        "relations": [relation.model_dump(mode="json") for relation in delta.relations],
+        "removed_relations": delta.removed_relations,
+    }
+
+
+def write_graph_delta(project_id: str, record: dict) -> None:
+    _append_journal(project_id, record)
+    if project_id in _dirty_graphs:
+        _schedule_flush()
+
+
+async def flush_graphs() -> None:
+    async with _flush_lock:
+        while (dirty := _take_dirty_graph()) is not None:
+            await asyncio.to_thread(_write_graph, *dirty)
+
+
+async def _flush_graphs_later() -> None:
+    await asyncio.sleep(GRAPH_FLUSH_DELAY_SECONDS)
+    await flush_graphs()
+
+
+def delete_graph(project_id: str) -> None:
+    with _cache_lock:
+        _graph_cache.pop(project_id, None)
+        _evicted_graphs.pop(project_id, None)
+        _dirty_graphs.discard(project_id)
+        _graph_mtimes.pop(project_id, None)
+        _journal_seqs.pop(project_id, None)
+        _journal_pending.pop(project_id, None)
+        _graph_generations[project_id] = _graph_generations.get(project_id, 0) + 1
+        _bump_graph_version(project_id)
+    with _graph_file_lock:
+        _graph_file(project_id).unlink(missing_ok=True)
+        _legacy_graph_file(project_id).unlink(missing_ok=True)
+        with _journal_lock:
+            _journal_file(project_id).unlink(missing_ok=True)
 
 
 def new_entity_id() -> str:
@@ -1,18 +1,34 @@
 import asyncio
+import codecs
+import hashlib
 import logging
 import re
 import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
+from typing import AsyncIterator, Awaitable, Iterator
 
+import orjson
 from fastapi import BackgroundTasks, Depends, FastAPI, File, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from .crud import create_project, delete_project, get_project, list_projects, update_project
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .crud import (
+    create_project,
+    delete_project,
+    get_project,
+    get_project_counts,
+    get_project_json,
+    list_projects,
+    project_exists,
+    update_project,
+)
 from .database import AsyncSessionLocal, get_session, init_db
-from .conflict_detector import ConflictDetector, SyncNodeResponse
+from .conflict_detector import ConflictDetector, SyncNodeResponse, node_fingerprint
 from .config import (
     get_api_key,
     get_base_url,
@@ -23,12 +39,23 @@ from .config import (
     settings,
 )
 from .graph import run_drafting_workflow, run_sync_workflow
-from .knowledge_graph import delete_graph, load_graph, save_graph
+from .knowledge_graph import (
+    Entity,
+    KnowledgeGraph,
+    delete_graph,
+    flush_graphs,
+    get_project_lock,
+    graph_version,
+    load_graph,
+    save_graph,
+    save_graph_delta,
+    write_graph_delta,
+)
 from .models import (
     CreateOutlineRequest,
-    CharacterGraphLink,
-    CharacterGraphNode,
     CharacterGraphResponse,
+    EntityMergeRequest,
+    EntityUpdateRequest,
     HealthResponse,
     KnowledgeDocumentRequest,
     KnowledgeImportRequest,
@@ -40,16 +67,22 @@ from .models import (
     ProjectExportData,
     ModelConfigResponse,
     ModelConfigUpdateRequest,
+    StoryNode,
     StoryProject,
     SyncNodeRequest,
     VersionCreateRequest,
     VersionUpdateRequest,
 )
 from .index_sync import SyncResult
-from .node_indexer import NodeIndexer
 from .sync_strategy import DEFAULT_SYNC_CONFIG, SyncMode, SyncQueue, build_default_sync_manager
 from .vectorstore import SearchResult
-from .world_knowledge import WorldKnowledgeBase, WorldDocument, WorldKnowledgeManager
+from .world_knowledge import (
+    WorldKnowledgeBase,
+    WorldDocument,
+    WorldKnowledgeManager,
+    WorldWriteOp,
+    WorldWriteQueue,
+)
 from .graph_editor import GraphEditor
 from .notifier import EventNotifier
 from .websocket_manager import ConnectionManager, WSMessageType
@@ -58,27 +91,242 @@ from .versioning import SnapshotType, VersionDiff, IndexSnapshot
 
 logger = logging.getLogger(__name__)
 
+EXPORT_SNAPSHOT_CONCURRENCY = 16
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+EXPORT_CACHE_SIZE = 64
+CHARACTER_GRAPH_CACHE_SIZE = 128
+KNOWLEDGE_STATS_CACHE_SIZE = 256
+HEARTBEAT_INTERVAL_SECONDS = 30
+SYNC_QUEUE_POLL_SECONDS = 1
+_GRAPH_ETAG_EPOCH = f"{time.time_ns():x}"
+_HEALTH_BYTES = orjson.dumps({"status": "ok", "version": "0.1.0"})
+_PING_MESSAGE = orjson.dumps({"type": WSMessageType.PING.value, "payload": {}}).decode()
+_PONG_MESSAGE = orjson.dumps({"type": WSMessageType.PONG.value, "payload": {}}).decode()
+
 index_sync_manager = build_default_sync_manager()
+node_indexer = index_sync_manager.node_indexer
 sync_queue = SyncQueue(DEFAULT_SYNC_CONFIG, index_sync_manager=index_sync_manager)
 conflict_detector = ConflictDetector()
 world_knowledge_manager = WorldKnowledgeManager()
+world_write_queue = WorldWriteQueue(world_knowledge_manager)
 ws_manager = ConnectionManager()
 notifier = EventNotifier(ws_manager)
 version_manager = VersionManager()
+export_cache: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+character_graph_cache: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+model_config_cache: ModelConfigResponse | None = None
+knowledge_stats_cache: OrderedDict[str, tuple[tuple[int, int] | None, int, int]] = OrderedDict()
+pending_graph_syncs: dict[str, dict[str, tuple[str, bool]]] = {}
 
 app = FastAPI(
     title="Novel Outline Service",
     description="FastAPI service for drafting and syncing story outlines.",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 
+_CJK_CHAR_RE = re.compile(r"[\u4e00-\u9fff]")
+_WORD_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
 def _count_words(text: str) -> int:
     if not text:
         return 0
-    cjk_chars = re.findall(r"[\u4e00-\u9fff]", text)
-    tokens = re.findall(r"[A-Za-z0-9]+", text)
-    return len(cjk_chars) + len(tokens)
+    cjk_chars = sum(1 for _ in _CJK_CHAR_RE.finditer(text))
+    tokens = sum(1 for _ in _WORD_TOKEN_RE.finditer(text))
+    return cjk_chars + tokens
+
+
+async def _knowledge_stats(project_id: str) -> tuple[int, int]:
+    signature = world_knowledge_manager.documents_signature(project_id)
+    cached = knowledge_stats_cache.get(project_id)
+    if cached is not None and cached[0] == signature:
+        knowledge_stats_cache.move_to_end(project_id)
+        return cached[1], cached[2]
+    documents = await world_knowledge_manager.list_project_documents(project_id)
+    total_words = sum(_count_words(doc.content) for doc in documents)
+    knowledge_stats_cache[project_id] = (signature, len(documents), total_words)
+    knowledge_stats_cache.move_to_end(project_id)
+    while len(knowledge_stats_cache) > KNOWLEDGE_STATS_CACHE_SIZE:
+        knowledge_stats_cache.popitem(last=False)
+    return len(documents), total_words
+
+
+def _export_etag(
+    project_json: bytes,
+    graph: KnowledgeGraph,
+    world_documents: list[WorldDocument],
+    snapshot_records: list[dict],
+) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(project_json)
+    digest.update(f"|{graph.last_updated.isoformat()}".encode("utf-8"))
+    for document in world_documents:
+        digest.update(f"|{document.id}:{document.updated_at.isoformat()}".encode("utf-8"))
+    for record in snapshot_records:
+        digest.update(
+            f"|{record['version']}:{record['snapshot_type']}:{record['name']}:"
+            f"{record['description']}:{record['is_compressed']}".encode("utf-8")
+        )
+    return f'"{digest.hexdigest()}"'
+
+
+def _json_array(models: list[BaseModel]) -> bytes:
+    return b"[" + b",".join(model.model_dump_json().encode("utf-8") for model in models) + b"]"
+
+
+def _iter_character_graph(graph: KnowledgeGraph) -> Iterator[bytes]:
+    yield b'{"nodes":['
+    for index, entity in enumerate(graph.entities):
+        if index:
+            yield b","
+        yield orjson.dumps(
+            {
+                "id": entity.id,
+                "name": entity.name,
+                "type": entity.type.value,
+                "description": entity.description,
+                "aliases": entity.aliases,
+                "properties": entity.properties,
+                "source_refs": entity.source_refs,
+            }
+        )
+    yield b'],"links":['
+    for index, relation in enumerate(graph.relations):
+        if index:
+            yield b","
+        yield orjson.dumps(
+            {
+                "source": relation.source_id,
+                "target": relation.target_id,
+                "relation_type": relation.relation_type.value,
+                "relation_name": relation.relation_name,
+                "description": relation.description,
+            }
+        )
+    yield b"]}"
+
+
+def _build_model_config() -> ModelConfigResponse:
+    return ModelConfigResponse(
+        base_url=get_base_url(),
+        drafting_model=get_model_name("drafting"),
+        sync_model=get_model_name("sync"),
+        extraction_model=get_model_name("extraction"),
+        has_default_key=bool(get_api_key("default")),
+        has_drafting_key=bool(get_api_key("drafting")),
+        has_sync_key=bool(get_api_key("sync")),
+        has_extraction_key=bool(get_api_key("extraction")),
+    )
+
+
+async def load_project(
+    project_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> StoryProject:
+    cached = getattr(request.state, "project", None)
+    if cached is not None and cached.id == project_id:
+        return cached
+    project = await get_project(session, project_id)
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+    request.state.project = project
+    return project
+
+
+async def _global_heartbeat() -> None:
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+        await ws_manager.broadcast_raw_all(_PING_MESSAGE)
+
+
+async def _publish_graph_sync(
+    project_id: str, processed: list[tuple[StoryNode, SyncResult]]
+) -> None:
+    project_syncs = pending_graph_syncs.get(project_id, {})
+    requests = [(node, project_syncs.pop(node.id, None)) for node, _result in processed]
+    if not project_syncs:
+        pending_graph_syncs.pop(project_id, None)
+    messages = [
+        notifier.graph_updated_message(
+            '{"updates":'
+            + _json_array([result for _node, result in processed]).decode("utf-8")
+            + "}"
+        )
+    ]
+    changed_nodes = [node for node, request in requests if request is None or request[1]]
+    if changed_nodes:
+        async with AsyncSessionLocal() as session:
+            latest_project = await get_project(session, project_id)
+        if latest_project:
+            snapshot_version = graph_version(project_id)
+            graph_snapshot = await asyncio.to_thread(load_graph, project_id, False)
+            for node in changed_nodes:
+                conflicts = await conflict_detector.detect_conflicts(
+                    project=latest_project,
+                    graph=graph_snapshot,
+                    modified_node=node,
+                    graph_version=snapshot_version,
+                )
+                if conflicts:
+                    messages.append(
+                        notifier.conflict_detected_message(
+                            _json_array(conflicts).decode("utf-8")
+                        )
+                    )
+    await notifier.notify_many_raw(project_id, messages)
+    for node, request in requests:
+        await notifier.notify_sync_progress(
+            project_id,
+            "completed",
+            {"node_id": node.id, "request_id": request[0] if request else None},
+        )
+
+
+async def _graph_sync_loop() -> None:
+    while True:
+        await asyncio.sleep(SYNC_QUEUE_POLL_SECONDS)
+        for project_id in sync_queue.pending_project_ids():
+            try:
+                processed = await sync_queue.process_ready_nodes(project_id)
+                if processed.get(project_id):
+                    await _publish_graph_sync(project_id, processed[project_id])
+            except Exception as exc:
+                logger.exception("Graph sync failed for project %s", project_id)
+                for node_id, (request_id, _changed) in pending_graph_syncs.pop(
+                    project_id, {}
+                ).items():
+                    await notifier.notify_sync_progress(
+                        project_id,
+                        "failed",
+                        {"error": str(exc), "node_id": node_id, "request_id": request_id},
+                    )
+
+
+async def _iter_upload_text(file: UploadFile) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    received = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            received += len(chunk)
+            if received > MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Uploaded file is too large",
+                )
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported file encoding (expected UTF-8)",
+        )
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -92,21 +340,42 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup() -> None:
     await init_db()
+    app.openapi()
     asyncio.create_task(version_manager.auto_snapshot_loop())
+    asyncio.create_task(_global_heartbeat())
+    if DEFAULT_SYNC_CONFIG.graph_sync_mode in (SyncMode.DEBOUNCED, SyncMode.BATCH):
+        asyncio.create_task(_graph_sync_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await world_write_queue.stop()
+    await flush_graphs()
+    await asyncio.to_thread(index_sync_manager.shutdown)
+
+
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            logger.info("%s %s %.2fms", scope["method"], scope["path"], duration_ms)
 
 
-@app.middleware("http")
-async def request_logging_middleware(request: Request, call_next):
-    start_time = time.perf_counter()
-    response = await call_next(request)
-    duration_ms = (time.perf_counter() - start_time) * 1000
-    logger.info("%s %s %.2fms", request.method, request.url.path, duration_ms)
-    return response
+app.add_middleware(RequestLoggingMiddleware)
 
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"error": exc.__class__.__name__, "detail": str(exc)},
     )
@@ -114,7 +383,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"error": exc.__class__.__name__, "detail": str(exc.detail)},
     )
@@ -122,7 +391,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 @app.post(
     "/api/create_outline",
-    response_model=StoryProject,
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": StoryProject}},
     status_code=status.HTTP_200_OK,
 )
 async def create_outline(
@@ -138,12 +408,13 @@ async def create_outline(
             )
     project = await run_drafting_workflow(payload)
     await create_project(session, project)
-    return project
+    return Response(content=project.model_dump_json(), media_type="application/json")
 
 
 @app.post(
     "/api/sync_node",
-    response_model=SyncNodeResponse,
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": SyncNodeResponse}},
     status_code=status.HTTP_200_OK,
 )
 async def sync_node(
@@ -164,50 +435,56 @@ async def sync_node(
         {"node_id": payload.node.id, "request_id": request_id},
     )
 
-    old_node = next(
-        (node for node in project.nodes if node.id == payload.node.id),
-        None,
-    )
+    old_node = project.get_node(payload.node.id)
 
-    await version_manager.create_pre_sync_snapshot_if_needed(
-        project=project,
-        old_node=old_node,
-        new_node=payload.node,
-    )
+    if version_manager.needs_pre_sync_snapshot(old_node, payload.node):
+        pre_sync_project = project.model_copy(deep=True)
+        pre_sync_graph = await asyncio.to_thread(
+            load_graph, payload.project_id, False
+        )
+        background_tasks.add_task(
+            version_manager.create_snapshot,
+            pre_sync_project,
+            pre_sync_graph,
+            SnapshotType.PRE_SYNC,
+            name="Pre-sync backup",
+        )
     updated_project = await run_sync_workflow(project, payload.node)
     await update_project(session, updated_project.id, updated_project)
 
-    updated_node = next(
-        (node for node in updated_project.nodes if node.id == payload.node.id),
-        payload.node,
-    )
+    updated_node = updated_project.get_node(payload.node.id) or payload.node
+    conflict_inputs_changed = old_node is None or node_fingerprint(
+        old_node
+    ) != node_fingerprint(updated_node)
 
-    await notifier.notify_node_updated(
-        payload.project_id,
-        updated_node.model_dump(),
-        updated_by="user",
-    )
+    notifications: list[Awaitable[None]] = [
+        asyncio.create_task(
+            notifier.notify_node_updated_raw(
+                payload.project_id,
+                updated_node.model_dump_json(),
+                updated_by="user",
+            )
+        )
+    ]
 
-    sync_result = SyncResult(success=True, vector_updated=False, graph_updated=False)
+    sync_result = SyncResult.model_construct(
+        success=True, vector_updated=False, graph_updated=False
+    )
     sync_status = "pending"
 
-    async def _load_latest_project() -> StoryProject | None:
-        async with AsyncSessionLocal() as session:
-            return await get_project(session, payload.project_id)
-
     async def sync_graph_background() -> None:
         nonlocal sync_result
         try:
             async def sync_vector_with_delay(delay: int) -> None:
                 await asyncio.sleep(delay)
-                await index_sync_manager.node_indexer.index_node(
+                await node_indexer.index_node(
                     payload.project_id, updated_node
                 )
                 sync_result.vector_updated = True
 
             if DEFAULT_SYNC_CONFIG.graph_sync_mode == SyncMode.MANUAL:
                 if DEFAULT_SYNC_CONFIG.vector_sync_mode == SyncMode.IMMEDIATE:
-                    await index_sync_manager.node_indexer.index_node(
+                    await node_indexer.index_node(
                         payload.project_id, updated_node
                     )
                     sync_result.vector_updated = True
@@ -223,7 +500,7 @@ async def sync_node(
                     await sync_vector_with_delay(delay)
             else:
                 if DEFAULT_SYNC_CONFIG.vector_sync_mode == SyncMode.IMMEDIATE:
-                    await index_sync_manager.node_indexer.index_node(
+                    await node_indexer.index_node(
                         payload.project_id, updated_node
                     )
                     sync_result.vector_updated = True
@@ -231,38 +508,18 @@ async def sync_node(
                     SyncMode.DEBOUNCED,
                     SyncMode.BATCH,
                 ):
+                    project_syncs = pending_graph_syncs.setdefault(payload.project_id, {})
+                    previous = project_syncs.get(updated_node.id)
+                    project_syncs[updated_node.id] = (
+                        request_id,
+                        conflict_inputs_changed or (previous is not None and previous[1]),
+                    )
                     await sync_queue.enqueue(
                         payload.project_id,
                         updated_node,
                         old_node=old_node,
                     )
-                    results = await sync_queue.process_ready(payload.project_id)
-                    if not results:
-                        delay = (
-                            DEFAULT_SYNC_CONFIG.debounce_seconds
-                            if DEFAULT_SYNC_CONFIG.graph_sync_mode == SyncMode.DEBOUNCED
-                            else DEFAULT_SYNC_CONFIG.batch_timeout_seconds
-                        )
-                        await asyncio.sleep(delay)
-                        results = await sync_queue.process_ready(payload.project_id)
-                    if results:
-                        await notifier.notify_graph_updated(
-                            payload.project_id,
-                            {"updates": [result.model_dump() for result in results]},
-                        )
-                        latest_project = await _load_latest_project()
-                        if latest_project:
-                            graph_snapshot = load_graph(payload.project_id)
-                            conflicts = await conflict_detector.detect_conflicts(
-                                project=latest_project,
-                                graph=graph_snapshot,
-                                modified_node=updated_node,
-                            )
-                            if conflicts:
-                                await notifier.notify_conflict_detected(
-                                    payload.project_id,
-                                    [conflict.model_dump() for conflict in conflicts],
-                                )
+                    return
             await notifier.notify_sync_progress(
                 payload.project_id,
                 "completed",
@@ -278,28 +535,35 @@ async def sync_node(
     conflicts: list = []
     if DEFAULT_SYNC_CONFIG.graph_sync_mode == SyncMode.IMMEDIATE:
         try:
-            current_graph = load_graph(payload.project_id)
-            sync_result = await index_sync_manager.sync_node_update(
-                project_id=payload.project_id,
-                old_node=old_node,
-                new_node=updated_node,
-                current_graph=current_graph,
-            )
-            save_graph(current_graph)
-            await notifier.notify_graph_updated(
-                payload.project_id, sync_result.model_dump()
-            )
+            async with get_project_lock(payload.project_id):
+                current_graph = await asyncio.to_thread(load_graph, payload.project_id)
+                sync_result = await index_sync_manager.sync_node_update(
+                    project_id=payload.project_id,
+                    old_node=old_node,
+                    new_node=updated_node,
+                    current_graph=current_graph,
+                )
+                save_graph(current_graph)
+            graph_messages = [
+                notifier.graph_updated_message(sync_result.model_dump_json())
+            ]
             graph_snapshot = current_graph
-            conflicts = await conflict_detector.detect_conflicts(
-                project=updated_project,
-                graph=graph_snapshot,
-                modified_node=updated_node,
-            )
+            if conflict_inputs_changed:
+                conflicts = await conflict_detector.detect_conflicts(
+                    project=updated_project,
+                    graph=graph_snapshot,
+                    modified_node=updated_node,
+                    graph_version=graph_version(payload.project_id),
+                )
             if conflicts:
-                await notifier.notify_conflict_detected(
-                    payload.project_id,
-                    [conflict.model_dump() for conflict in conflicts],
+                graph_messages.append(
+                    notifier.conflict_detected_message(
+                        _json_array(conflicts).decode("utf-8")
+                    )
                 )
+            notifications.append(
+                notifier.notify_many_raw(payload.project_id, graph_messages)
+            )
             sync_status = "completed"
             await notifier.notify_sync_progress(
                 payload.project_id,
@@ -315,16 +579,15 @@ async def sync_node(
                 {"error": str(exc), "node_id": payload.node.id, "request_id": request_id},
             )
     else:
-        def schedule_background_task() -> None:
-            asyncio.create_task(sync_graph_background())
-
-        background_tasks.add_task(schedule_background_task)
-    return SyncNodeResponse(
+        background_tasks.add_task(sync_graph_background)
+    await asyncio.gather(*notifications, return_exceptions=True)
+    response = SyncNodeResponse(
         project=updated_project,
         sync_result=sync_result,
         conflicts=conflicts,
         sync_status=sync_status,
     )
+    return Response(content=response.model_dump_json(), media_type="application/json")
 
 
 @app.get(
@@ -340,19 +603,20 @@ async def list_project_records(
 
 @app.get(
     "/api/projects/{project_id}",
-    response_model=StoryProject,
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": StoryProject}},
     status_code=status.HTTP_200_OK,
 )
 async def get_project_record(
     project_id: str,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    content = await get_project_json(session, project_id)
+    if content is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    return project
+    return Response(content=content, media_type="application/json")
 
 
 @app.get(
@@ -362,29 +626,56 @@ async def get_project_record(
 )
 async def export_project_data(
     project_id: str,
-    session: AsyncSession = Depends(get_session),
+    request: Request,
+    project: StoryProject = Depends(load_project),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+    graph, world_documents, snapshot_records = await asyncio.gather(
+        asyncio.to_thread(load_graph, project_id, False),
+        world_knowledge_manager.list_project_documents(project_id),
+        version_manager.list_versions(project_id),
+    )
+    project_json = project.model_dump_json().encode("utf-8")
+    etag = _export_etag(project_json, graph, world_documents, snapshot_records)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    cached = export_cache.get(project_id)
+    if cached is not None and cached[0] == etag:
+        export_cache.move_to_end(project_id)
+        return Response(
+            content=cached[1], media_type="application/json", headers={"ETag": etag}
+        )
+
+    snapshot_slots = asyncio.Semaphore(EXPORT_SNAPSHOT_CONCURRENCY)
+
+    async def _load_export_snapshot(version: int) -> IndexSnapshot:
+        async with snapshot_slots:
+            return await version_manager.load_snapshot(project_id, version)
+
+    loaded = await asyncio.gather(
+        *(_load_export_snapshot(record["version"]) for record in snapshot_records),
+        return_exceptions=True,
+    )
+    snapshots = [
+        snapshot for snapshot in loaded if not isinstance(snapshot, BaseException)
+    ]
+    body = b"".join(
+        (
+            b'{"project":',
+            project_json,
+            b',"knowledge_graph":',
+            graph.model_dump_json().encode("utf-8"),
+            b',"world_documents":',
+            _json_array(world_documents),
+            b',"snapshots":',
+            _json_array(snapshots),
+            b"}",
         )
-    graph = load_graph(project_id)
-    world_documents = await world_knowledge_manager.list_project_documents(project_id)
-    snapshot_records = await version_manager.list_versions(project_id)
-    snapshots = []
-    for record in snapshot_records:
-        try:
-            snapshot = await version_manager.load_snapshot(project_id, record["version"])
-            snapshots.append(snapshot.model_dump(mode="json"))
-        except Exception:
-            continue
-    return ProjectExportData(
-        project=project,
-        knowledge_graph=graph,
-        world_documents=world_documents,
-        snapshots=snapshots,
     )
+    export_cache[project_id] = (etag, body)
+    export_cache.move_to_end(project_id)
+    while len(export_cache) > EXPORT_CACHE_SIZE:
+        export_cache.popitem(last=False)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @app.put(
@@ -395,13 +686,9 @@ async def export_project_data(
 async def update_project_record(
     project_id: str,
     payload: ProjectUpdateRequest,
+    project: StoryProject = Depends(load_project),
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
-        )
     title = payload.title.strip()
     if not title:
         raise HTTPException(
@@ -423,8 +710,7 @@ async def import_project_data(
     session: AsyncSession = Depends(get_session),
 ):
     project = payload.project
-    existing = await get_project(session, project.id)
-    if existing is not None:
+    if await project_exists(session, project.id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Project already exists",
@@ -442,7 +728,6 @@ async def import_project_data(
             continue
     if snapshots:
         await version_manager.import_snapshots(snapshots)
-    node_indexer = NodeIndexer()
     await node_indexer.clear_project(project.id)
     await node_indexer.index_project(project)
     return project
@@ -456,22 +741,23 @@ async def delete_project_record(
     project_id: str,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
     deleted = await delete_project(session, project_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    if project:
-        node_indexer = NodeIndexer()
-        await node_indexer.clear_project(project_id)
-        logger.info("Deleted project %s nodes from vector index", project_id)
-        await world_knowledge_manager.delete_project_data(project_id)
-        logger.info("Deleted project %s world knowledge data", project_id)
-        delete_graph(project_id)
-        logger.info("Deleted project %s knowledge graph data", project_id)
-        await version_manager.delete_project_data(project_id)
-        logger.info("Deleted project %s version snapshots", project_id)
+    conflict_detector.invalidate(project_id)
+    knowledge_stats_cache.pop(project_id, None)
+    await asyncio.gather(
+        node_indexer.clear_project(project_id),
+        world_knowledge_manager.delete_project_data(project_id),
+        asyncio.to_thread(delete_graph, project_id),
+        version_manager.delete_project_data(project_id),
+    )
+    logger.info(
+        "Deleted project %s vector index, world knowledge, graph and snapshots",
+        project_id,
+    )
     return {"deleted": True}
 
 
@@ -485,8 +771,7 @@ async def create_world_document(
     payload: KnowledgeDocumentRequest,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -507,8 +792,7 @@ async def get_world_knowledge_base(
     project_id: str,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -525,8 +809,7 @@ async def get_world_document(
     doc_id: str,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -549,8 +832,7 @@ async def update_world_document(
     payload: KnowledgeUpdateRequest,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -575,8 +857,7 @@ async def delete_world_document(
     doc_id: str,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -594,8 +875,7 @@ async def import_world_knowledge(
     payload: KnowledgeImportRequest,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -615,8 +895,7 @@ async def search_world_knowledge(
     payload: KnowledgeSearchRequest,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -638,8 +917,7 @@ async def upload_world_knowledge(
     file: UploadFile = File(...),
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
@@ -649,27 +927,27 @@ async def upload_world_knowledge(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file type"
         )
-
-    raw = await file.read()
-    try:
-        content = raw.decode("utf-8")
-    except UnicodeDecodeError:
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Unsupported file encoding (expected UTF-8)",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Uploaded file is too large",
         )
+
     if filename.endswith(".md"):
-        documents = await world_knowledge_manager.import_from_markdown(
+        documents = await world_knowledge_manager.import_from_markdown_stream(
             project_id=project_id,
-            markdown_content=content,
+            chunks=_iter_upload_text(file),
         )
     else:
         title = Path(filename).stem or "未命名世界观"
-        document = await world_knowledge_manager.add_document(
-            project_id=project_id,
-            title=title,
-            category="general",
-            content=content,
+        content = "".join([chunk async for chunk in _iter_upload_text(file)])
+        document = await world_write_queue.submit(
+            WorldWriteOp(
+                project_id=project_id,
+                title=title,
+                category="general",
+                content=content,
+            )
         )
         documents = [document]
     return documents
@@ -684,18 +962,20 @@ async def get_project_stats(
     project_id: str,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    counts, (total_knowledge_docs, total_words), graph_snapshot = await asyncio.gather(
+        get_project_counts(session, project_id),
+        _knowledge_stats(project_id),
+        asyncio.to_thread(load_graph, project_id, False),
+    )
+    if counts is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    knowledge_base = await world_knowledge_manager.get_knowledge_base(project_id)
-    graph_snapshot = load_graph(project_id)
-    total_words = sum(_count_words(doc.content) for doc in knowledge_base.documents)
+    total_nodes, total_characters = counts
     return ProjectStatsResponse(
-        total_nodes=len(project.nodes),
-        total_characters=len(project.characters),
-        total_knowledge_docs=len(knowledge_base.documents),
+        total_nodes=total_nodes,
+        total_characters=total_characters,
+        total_knowledge_docs=total_knowledge_docs,
         total_words=total_words,
         graph_entities=len(graph_snapshot.entities),
         graph_relations=len(graph_snapshot.relations),
@@ -711,8 +991,7 @@ async def list_project_versions(
     project_id: str,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     return await version_manager.list_versions(project_id)
 
@@ -727,8 +1006,7 @@ async def get_project_version(
     version: int,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     try:
         snapshot = await version_manager.load_snapshot(project_id, version)
@@ -748,8 +1026,7 @@ async def compare_project_versions(
     to_ver: int,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     return await version_manager.compare_versions(project_id, from_ver, to_ver)
 
@@ -764,16 +1041,20 @@ async def create_project_version(
     payload: VersionCreateRequest,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     snapshot_type = SnapshotType.MANUAL
     if payload.type:
         try:
             snapshot_type = SnapshotType(payload.type)
         except ValueError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid snapshot type")
-    graph = load_graph(project_id)
+    project, graph = await asyncio.gather(
+        get_project(session, project_id),
+        asyncio.to_thread(load_graph, project_id, False),
+    )
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
     return await version_manager.create_snapshot(
         project=project,
         graph=graph,
@@ -793,8 +1074,7 @@ async def restore_project_version(
     version: int,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     try:
         restored_project, restored_graph, restored_docs = await version_manager.restore_snapshot(
@@ -804,7 +1084,7 @@ async def restore_project_version(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
     await update_project(session, restored_project.id, restored_project)
     save_graph(restored_graph)
-    node_indexer = NodeIndexer()
+    await flush_graphs()
     await node_indexer.clear_project(project_id)
     await node_indexer.index_project(restored_project)
     await world_knowledge_manager.replace_project_documents(project_id, restored_docs)
@@ -820,8 +1100,7 @@ async def delete_project_version(
     version: int,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     try:
         await version_manager.delete_version(project_id, version)
@@ -843,8 +1122,7 @@ async def update_project_version(
     payload: VersionUpdateRequest,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
+    if not await project_exists(session, project_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     snapshot_type = SnapshotType.MILESTONE if payload.promote_to_milestone else None
     try:
@@ -864,16 +1142,6 @@ async def update_project_version(
 async def websocket_endpoint(websocket: WebSocket, project_id: str):
     await ws_manager.connect(project_id, websocket)
 
-    async def heartbeat() -> None:
-        while True:
-            await asyncio.sleep(30)
-            try:
-                await websocket.send_json({"type": WSMessageType.PING.value, "payload": {}})
-            except Exception:
-                break
-
-    heartbeat_task = asyncio.create_task(heartbeat())
-
     try:
         while True:
             data = await websocket.receive_json()
@@ -881,46 +1149,52 @@ async def websocket_endpoint(websocket: WebSocket, project_id: str):
             if message_type == WSMessageType.PONG.value:
                 continue
             if message_type == WSMessageType.PING.value:
-                await websocket.send_json({"type": WSMessageType.PONG.value, "payload": {}})
+                await websocket.send_text(_PONG_MESSAGE)
     except WebSocketDisconnect:
         pass
     except Exception:
         pass
     finally:
-        heartbeat_task.cancel()
         ws_manager.disconnect(project_id, websocket)
 
 
 @app.put(
     "/api/projects/{project_id}/graph/entities/{entity_id}",
-    response_model=dict,
+    response_model=Entity,
     status_code=status.HTTP_200_OK,
 )
 async def update_graph_entity(
     project_id: str,
     entity_id: str,
-    payload: dict,
+    payload: EntityUpdateRequest,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+    async with get_project_lock(project_id):
+        exists, cached_graph = await asyncio.gather(
+            project_exists(session, project_id),
+            asyncio.to_thread(load_graph, project_id, False),
         )
-    graph = load_graph(project_id)
-    editor = GraphEditor(graph)
-    try:
-        entity = await editor.update_entity(entity_id, payload)
-    except ValueError as exc:
-        detail = str(exc) or "Invalid entity update"
-        status_code = (
-            status.HTTP_404_NOT_FOUND
-            if detail == "Entity not found"
-            else status.HTTP_400_BAD_REQUEST
-        )
-        raise HTTPException(status_code=status_code, detail=detail)
-    save_graph(graph)
-    return entity.model_dump()
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+            )
+        editor = GraphEditor(cached_graph.model_copy())
+        try:
+            entity = await editor.update_entity(
+                entity_id, payload.model_dump(exclude_unset=True)
+            )
+        except ValueError as exc:
+            detail = str(exc) or "Invalid entity update"
+            status_code = (
+                status.HTTP_404_NOT_FOUND
+                if detail == "Entity not found"
+                else status.HTTP_400_BAD_REQUEST
+            )
+            raise HTTPException(status_code=status_code, detail=detail)
+        journal_record = save_graph_delta(editor.graph, editor.delta)
+    background_tasks.add_task(write_graph_delta, project_id, journal_record)
+    return entity
 
 
 @app.delete(
@@ -931,66 +1205,71 @@ async def update_graph_entity(
 async def delete_graph_entity(
     project_id: str,
     entity_id: str,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
-        )
-    graph = load_graph(project_id)
-    editor = GraphEditor(graph)
-    try:
-        stats = await editor.delete_entity(entity_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Entity not found"
+    async with get_project_lock(project_id):
+        exists, cached_graph = await asyncio.gather(
+            project_exists(session, project_id),
+            asyncio.to_thread(load_graph, project_id, False),
         )
-    save_graph(graph)
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+            )
+        editor = GraphEditor(cached_graph.model_copy())
+        try:
+            stats = await editor.delete_entity(entity_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Entity not found"
+            )
+        journal_record = save_graph_delta(editor.graph, editor.delta)
+    background_tasks.add_task(write_graph_delta, project_id, journal_record)
     return stats
 
 
 @app.post(
     "/api/projects/{project_id}/graph/entities/{entity_id}/merge",
-    response_model=dict,
+    response_model=Entity,
     status_code=status.HTTP_200_OK,
 )
 async def merge_graph_entities(
     project_id: str,
     entity_id: str,
-    payload: dict,
+    payload: EntityMergeRequest,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
 ):
-    project = await get_project(session, project_id)
-    if project is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
-        )
-    target_id = payload.get("into_id")
-    if not target_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Missing into_id",
+    async with get_project_lock(project_id):
+        exists, cached_graph = await asyncio.gather(
+            project_exists(session, project_id),
+            asyncio.to_thread(load_graph, project_id, False),
         )
-    graph = load_graph(project_id)
-    editor = GraphEditor(graph)
-    try:
-        entity = await editor.merge_entities(entity_id, target_id)
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
-        )
-    save_graph(graph)
-    return entity.model_dump()
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+            )
+        editor = GraphEditor(cached_graph.model_copy())
+        try:
+            entity = await editor.merge_entities(entity_id, payload.into_id)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            )
+        journal_record = save_graph_delta(editor.graph, editor.delta)
+    background_tasks.add_task(write_graph_delta, project_id, journal_record)
+    return entity
 
 
 @app.get(
     "/api/health",
-    response_model=HealthResponse,
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": HealthResponse}},
     status_code=status.HTTP_200_OK,
 )
-def health():
-    return {"status": "ok", "version": "0.1.0"}
+async def health():
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
 @app.get(
@@ -999,16 +1278,10 @@ def health():
     status_code=status.HTTP_200_OK,
 )
 def get_model_config():
-    return ModelConfigResponse(
-        base_url=get_base_url(),
-        drafting_model=get_model_name("drafting"),
-        sync_model=get_model_name("sync"),
-        extraction_model=get_model_name("extraction"),
-        has_default_key=bool(get_api_key("default")),
-        has_drafting_key=bool(get_api_key("drafting")),
-        has_sync_key=bool(get_api_key("sync")),
-        has_extraction_key=bool(get_api_key("extraction")),
-    )
+    global model_config_cache
+    if model_config_cache is None:
+        model_config_cache = _build_model_config()
+    return model_config_cache
 
 
 @app.post(
@@ -1033,59 +1306,51 @@ def update_model_config(payload: ModelConfigUpdateRequest):
         set_model_override("sync", payload.sync_model)
     if payload.extraction_model is not None:
         set_model_override("extraction", payload.extraction_model)
-    return ModelConfigResponse(
-        base_url=get_base_url(),
-        drafting_model=get_model_name("drafting"),
-        sync_model=get_model_name("sync"),
-        extraction_model=get_model_name("extraction"),
-        has_default_key=bool(get_api_key("default")),
-        has_drafting_key=bool(get_api_key("drafting")),
-        has_sync_key=bool(get_api_key("sync")),
-        has_extraction_key=bool(get_api_key("extraction")),
-    )
+    global model_config_cache
+    model_config_cache = _build_model_config()
+    return model_config_cache
 
 
 @app.get(
     "/api/character_graph",
-    response_model=CharacterGraphResponse,
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": CharacterGraphResponse}},
     status_code=status.HTTP_200_OK,
 )
 async def get_character_graph(
+    request: Request,
     project_id: str | None = None,
     session: AsyncSession = Depends(get_session),
 ):
     if not project_id:
         return CharacterGraphResponse()
 
-    project = await get_project(session, project_id)
-    if project is None:
+    version = graph_version(project_id)
+    exists, graph = await asyncio.gather(
+        project_exists(session, project_id),
+        asyncio.to_thread(load_graph, project_id, False),
+    )
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-
-    graph = load_graph(project_id)
-    nodes = [
-        CharacterGraphNode(
-            id=entity.id,
-            name=entity.name,
-            type=entity.type.value if hasattr(entity.type, "value") else str(entity.type),
-            description=entity.description,
-            aliases=entity.aliases,
-            properties=entity.properties or {},
-            source_refs=entity.source_refs,
-        )
-        for entity in graph.entities
-    ]
-    links = [
-        CharacterGraphLink(
-            source=relation.source_id,
-            target=relation.target_id,
-            relation_type=relation.relation_type.value
-            if hasattr(relation.relation_type, "value")
-            else str(relation.relation_type),
-            relation_name=relation.relation_name,
-            description=relation.description,
-        )
-        for relation in graph.relations
-    ]
-    return CharacterGraphResponse(nodes=nodes, links=links)
+    etag = f'W/"{project_id}-{_GRAPH_ETAG_EPOCH}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    cached = character_graph_cache.get(project_id)
+    if cached is not None and cached[0] == version:
+        character_graph_cache.move_to_end(project_id)
+        return Response(content=cached[1], media_type="application/json", headers=headers)
+
+    async def stream() -> AsyncIterator[bytes]:
+        chunks: list[bytes] = []
+        for chunk in _iter_character_graph(graph):
+            chunks.append(chunk)
+            yield chunk
+        character_graph_cache[project_id] = (version, b"".join(chunks))
+        character_graph_cache.move_to_end(project_id)
+        while len(character_graph_cache) > CHARACTER_GRAPH_CACHE_SIZE:
+            character_graph_cache.popitem(last=False)
+
+    return StreamingResponse(stream(), media_type="application/json", headers=headers)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import sys
 from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator, model_validator
 
-from .knowledge_graph import KnowledgeGraph
+from .knowledge_graph import EntityType, KnowledgeGraph
 from .world_knowledge import WorldDocument
 
 class StoryNode(BaseModel):
@@ -46,6 +47,13 @@ class StoryNode(BaseModel):
             raise ValueError("timeline_order must be > 0")
         return value
 
+    @model_validator(mode="after")
+    def intern_refs(self) -> "StoryNode":
+        self.location_tag = sys.intern(self.location_tag)
+        if self.characters:
+            self.characters = [sys.intern(character_id) for character_id in self.characters]
+        return self
+
 
 class CharacterProfile(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
@@ -82,6 +90,10 @@ class StoryProject(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    _nodes_by_id: dict[str, StoryNode] = PrivateAttr(default_factory=dict)
+    _indexed_nodes: list[StoryNode] | None = PrivateAttr(default=None)
+    _indexed_node_count: int = PrivateAttr(default=0)
+
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
@@ -120,6 +132,15 @@ class StoryProject(BaseModel):
             self.updated_at = self.created_at
         return self
 
+    def get_node(self, node_id: str) -> StoryNode | None:
+        if self._indexed_nodes is not self.nodes or self._indexed_node_count != len(
+            self.nodes
+        ):
+            self._nodes_by_id = {node.id: node for node in self.nodes}
+            self._indexed_nodes = self.nodes
+            self._indexed_node_count = len(self.nodes)
+        return self._nodes_by_id.get(node_id)
+
 
 class CreateOutlineRequest(BaseModel):
     world_view: str
@@ -228,6 +249,26 @@ class ProjectUpdateRequest(BaseModel):
     title: str
 
 
+ENTITY_TEXT_MAX_LENGTH = 10_000
+
+
+class EntityUpdateRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", str_max_length=ENTITY_TEXT_MAX_LENGTH)
+
+    name: str | None = None
+    type: EntityType | None = None
+    description: str | None = None
+    aliases: list[str] | None = None
+    properties: dict[str, Any] | None = None
+    source_refs: list[str] | None = None
+
+
+class EntityMergeRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    into_id: str = Field(min_length=1)
+
+
 class ProjectExportData(BaseModel):
     project: StoryProject
     knowledge_graph: KnowledgeGraph
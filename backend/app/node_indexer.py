@@ -1,24 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Iterable
 
-from .crud import get_project
+from .crud import get_project, get_project_updated_at
 from .database import AsyncSessionLocal
 from .models import StoryNode, StoryProject
-from .vectorstore import add_documents, delete_by_filter, delete_by_ids, search_similar
+from .vectorstore import (
+    SearchResult,
+    add_documents,
+    delete_by_filter,
+    delete_by_ids,
+    search_similar,
+    upsert_documents,
+)
 from .bm25 import BM25
-from .text_utils import keyword_score, tokenize
+from .text_utils import node_text, tokenize
 
 
 def _doc_id(project_id: str, node_id: str) -> str:
     return f"{project_id}:{node_id}"
 
 
-def _node_text(node: StoryNode) -> str:
-    parts = [node.title.strip(), node.content.strip()]
-    return "\n\n".join(part for part in parts if part)
-
-
 def _node_metadata(project_id: str, node: StoryNode) -> dict:
     return {
         "project_id": project_id,
@@ -29,35 +36,213 @@ def _node_metadata(project_id: str, node: StoryNode) -> dict:
     }
 
 
-async def _load_project(project_id: str) -> StoryProject | None:
+INDEX_SHARD_SIZE = 64
+INDEX_CONCURRENCY = 8
+NODE_LOOKUP_CACHE_SIZE = 64
+BM25_VARIANT_CACHE_SIZE = 8
+
+
+@dataclass
+class _NodeLookup:
+    updated_at: datetime
+    nodes: list[StoryNode]
+    nodes_by_id: dict[str, StoryNode]
+    timeline: list[float]
+    timeline_nodes: list[StoryNode]
+    by_character: dict[str, list[StoryNode]]
+    node_tokens: list[list[str]] | None = None
+    node_token_sets: list[frozenset[str]] | None = None
+    bm25_variants: OrderedDict[str | None, tuple[list[StoryNode], BM25]] = field(
+        default_factory=OrderedDict
+    )
+
+    def tokens(self) -> list[list[str]]:
+        if self.node_tokens is None:
+            self.node_tokens = [
+                tokenize(f"{node.title}\n{node.content}") for node in self.nodes
+            ]
+        return self.node_tokens
+
+    def token_sets(self) -> list[frozenset[str]]:
+        if self.node_token_sets is None:
+            self.node_token_sets = [frozenset(tokens) for tokens in self.tokens()]
+        return self.node_token_sets
+
+    def bm25(self, exclude_node_id: str | None) -> tuple[list[StoryNode], BM25]:
+        exclude_node_id = exclude_node_id or None
+        cached = self.bm25_variants.get(exclude_node_id)
+        if cached is not None:
+            self.bm25_variants.move_to_end(exclude_node_id)
+            return cached
+        nodes: list[StoryNode] = []
+        corpus: list[list[str]] = []
+        for node, tokens in zip(self.nodes, self.tokens()):
+            if exclude_node_id and node.id == exclude_node_id:
+                continue
+            nodes.append(node)
+            corpus.append(tokens)
+        variant = (nodes, BM25(corpus))
+        self.bm25_variants[exclude_node_id] = variant
+        while len(self.bm25_variants) > BM25_VARIANT_CACHE_SIZE:
+            self.bm25_variants.popitem(last=False)
+        return variant
+
+
+_node_lookups: OrderedDict[str, _NodeLookup] = OrderedDict()
+
+
+def _build_node_lookup(project: StoryProject) -> _NodeLookup:
+    timeline_nodes = sorted(project.nodes, key=lambda node: node.timeline_order)
+    by_character: dict[str, list[StoryNode]] = {}
+    for node in project.nodes:
+        for character_id in dict.fromkeys(node.characters or []):
+            by_character.setdefault(character_id, []).append(node)
+    return _NodeLookup(
+        updated_at=project.updated_at,
+        nodes=list(project.nodes),
+        nodes_by_id={node.id: node for node in project.nodes},
+        timeline=[node.timeline_order for node in timeline_nodes],
+        timeline_nodes=timeline_nodes,
+        by_character=by_character,
+    )
+
+
+async def _load_node_lookup(project_id: str) -> _NodeLookup | None:
     async with AsyncSessionLocal() as session:
-        return await get_project(session, project_id)
+        updated_at = await get_project_updated_at(session, project_id)
+        if updated_at is None:
+            _node_lookups.pop(project_id, None)
+            return None
+        cached = _node_lookups.get(project_id)
+        if cached is not None and cached.updated_at == updated_at:
+            _node_lookups.move_to_end(project_id)
+            return cached
+        project = await get_project(session, project_id)
+    if project is None:
+        return None
+    lookup = _build_node_lookup(project)
+    _node_lookups[project_id] = lookup
+    _node_lookups.move_to_end(project_id)
+    while len(_node_lookups) > NODE_LOOKUP_CACHE_SIZE:
+        _node_lookups.popitem(last=False)
+    return lookup
+
+
+def _resolve_vector_results(
+    lookup: _NodeLookup | None,
+    results: list[SearchResult],
+    exclude_node_id: str | None,
+) -> list[tuple[StoryNode, float]]:
+    if not lookup:
+        return []
+    nodes_by_id = lookup.nodes_by_id
+    ordered: list[tuple[StoryNode, float]] = []
+    for result in results:
+        node_id = result.metadata.get("node_id")
+        if not node_id or node_id == exclude_node_id:
+            continue
+        node = nodes_by_id.get(node_id)
+        if node:
+            ordered.append((node, float(result.score)))
+    return ordered
+
+
+def _score_keyword(
+    lookup: _NodeLookup | None,
+    query: str,
+    exclude_node_id: str | None,
+    top_k: int,
+) -> list[tuple[StoryNode, float]]:
+    if not lookup:
+        return []
+
+    query_tokens = set(tokenize(query))
+    if not query_tokens:
+        return []
+    scored: list[tuple[StoryNode, int]] = []
+    for node, token_set in zip(lookup.nodes, lookup.token_sets()):
+        if exclude_node_id and node.id == exclude_node_id:
+            continue
+        score = len(token_set & query_tokens)
+        if score > 0:
+            scored.append((node, score))
+
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return [(node, float(score)) for node, score in scored[:top_k]]
+
+
+def _score_bm25(
+    lookup: _NodeLookup | None,
+    query: str,
+    exclude_node_id: str | None,
+    top_k: int,
+) -> list[tuple[StoryNode, float]]:
+    if not lookup:
+        return []
+
+    tokens = tokenize(query)
+    nodes, bm25 = lookup.bm25(exclude_node_id)
+    scored = [
+        (node, bm25.score(tokens, index))
+        for index, node in enumerate(nodes)
+    ]
+    scored = [item for item in scored if item[1] > 0]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
 
 
 class NodeIndexer:
     async def index_project(self, project: StoryProject) -> int:
-        if not project.nodes:
+        return await self.index_nodes_bulk(project.id, project.nodes)
+
+    async def index_nodes_bulk(
+        self,
+        project_id: str,
+        nodes: list[StoryNode],
+        shard_size: int = INDEX_SHARD_SIZE,
+        concurrency: int = INDEX_CONCURRENCY,
+    ) -> int:
+        if not nodes:
             return 0
+        slots = asyncio.Semaphore(concurrency)
+
+        async def index_shard(shard: list[StoryNode]) -> int:
+            async with slots:
+                return await self.batch_index_nodes(project_id, shard)
 
-        documents = [_node_text(node) for node in project.nodes]
-        metadatas = [_node_metadata(project.id, node) for node in project.nodes]
-        ids = [_doc_id(project.id, node.id) for node in project.nodes]
-        await add_documents("story_nodes", documents, metadatas, ids)
-        return len(project.nodes)
+        counts = await asyncio.gather(
+            *(
+                index_shard(nodes[start : start + shard_size])
+                for start in range(0, len(nodes), shard_size)
+            )
+        )
+        return sum(counts)
 
     async def index_node(self, project_id: str, node: StoryNode) -> None:
         await delete_by_ids("story_nodes", [_doc_id(project_id, node.id)])
         await add_documents(
             "story_nodes",
-            [_node_text(node)],
+            [node_text(node)],
             [_node_metadata(project_id, node)],
             [_doc_id(project_id, node.id)],
         )
 
+    async def batch_index_nodes(self, project_id: str, nodes: list[StoryNode]) -> int:
+        if not nodes:
+            return 0
+        await upsert_documents(
+            "story_nodes",
+            [node_text(node) for node in nodes],
+            [_node_metadata(project_id, node) for node in nodes],
+            [_doc_id(project_id, node.id) for node in nodes],
+        )
+        return len(nodes)
+
     async def remove_node(self, project_id: str, node_id: str) -> None:
         await delete_by_ids("story_nodes", [_doc_id(project_id, node_id)])
 
     async def clear_project(self, project_id: str) -> None:
+        _node_lookups.pop(project_id, None)
         await delete_by_filter("story_nodes", {"project_id": project_id})
 
     async def search_related_nodes(
@@ -82,26 +267,16 @@ class NodeIndexer:
         exclude_node_id: str | None = None,
         top_k: int = 10,
     ) -> list[tuple[StoryNode, float]]:
-        project = await _load_project(project_id)
-        if not project:
-            return []
-
-        results = await search_similar(
-            "story_nodes",
-            query=query,
-            top_k=top_k,
-            filter_dict={"project_id": project_id},
+        lookup, results = await asyncio.gather(
+            _load_node_lookup(project_id),
+            search_similar(
+                "story_nodes",
+                query=query,
+                top_k=top_k,
+                filter_dict={"project_id": project_id},
+            ),
         )
-        nodes_by_id = {node.id: node for node in project.nodes}
-        ordered: list[tuple[StoryNode, float]] = []
-        for result in results:
-            node_id = result.metadata.get("node_id")
-            if not node_id or node_id == exclude_node_id:
-                continue
-            node = nodes_by_id.get(node_id)
-            if node:
-                ordered.append((node, float(result.score)))
-        return ordered
+        return _resolve_vector_results(lookup, results, exclude_node_id)
 
     async def search_keyword_nodes(
         self,
@@ -110,22 +285,8 @@ class NodeIndexer:
         exclude_node_id: str | None = None,
         top_k: int = 8,
     ) -> list[tuple[StoryNode, float]]:
-        project = await _load_project(project_id)
-        if not project:
-            return []
-
-        tokens = tokenize(query)
-        scored: list[tuple[StoryNode, int]] = []
-        for node in project.nodes:
-            if exclude_node_id and node.id == exclude_node_id:
-                continue
-            text = f"{node.title}\n{node.content}"
-            score = keyword_score(tokens, text)
-            if score > 0:
-                scored.append((node, score))
-
-        scored.sort(key=lambda item: item[1], reverse=True)
-        return [(node, float(score)) for node, score in scored[:top_k]]
+        lookup = await _load_node_lookup(project_id)
+        return _score_keyword(lookup, query, exclude_node_id, top_k)
 
     async def search_bm25_nodes(
         self,
@@ -134,40 +295,45 @@ class NodeIndexer:
         exclude_node_id: str | None = None,
         top_k: int = 8,
     ) -> list[tuple[StoryNode, float]]:
-        project = await _load_project(project_id)
-        if not project:
-            return []
+        lookup = await _load_node_lookup(project_id)
+        return _score_bm25(lookup, query, exclude_node_id, top_k)
 
-        tokens = tokenize(query)
-        corpus = []
-        nodes = []
-        for node in project.nodes:
-            if exclude_node_id and node.id == exclude_node_id:
-                continue
-            text = f"{node.title}\n{node.content}"
-            corpus.append(tokenize(text))
-            nodes.append(node)
-
-        bm25 = BM25(corpus)
-        scored = [
-            (node, bm25.score(tokens, index))
-            for index, node in enumerate(nodes)
-        ]
-        scored = [item for item in scored if item[1] > 0]
-        scored.sort(key=lambda item: item[1], reverse=True)
-        return scored[:top_k]
+    async def search_hybrid(
+        self,
+        project_id: str,
+        query: str,
+        exclude_node_id: str | None = None,
+        top_k: int = 8,
+        keyword_top_k: int = 6,
+    ) -> tuple[
+        list[tuple[StoryNode, float]],
+        list[tuple[StoryNode, float]],
+        list[tuple[StoryNode, float]],
+    ]:
+        lookup, results = await asyncio.gather(
+            _load_node_lookup(project_id),
+            search_similar(
+                "story_nodes",
+                query=query,
+                top_k=top_k,
+                filter_dict={"project_id": project_id},
+            ),
+        )
+        return (
+            _resolve_vector_results(lookup, results, exclude_node_id),
+            _score_keyword(lookup, query, exclude_node_id, keyword_top_k),
+            _score_bm25(lookup, query, exclude_node_id, keyword_top_k),
+        )
 
     async def search_by_character(
         self,
         project_id: str,
         character_id: str,
     ) -> list[StoryNode]:
-        project = await _load_project(project_id)
-        if not project:
+        lookup = await _load_node_lookup(project_id)
+        if not lookup:
             return []
-        return [
-            node for node in project.nodes if character_id in (node.characters or [])
-        ]
+        return list(lookup.by_character.get(character_id, []))
 
     async def search_by_timeline_range(
         self,
@@ -175,11 +341,9 @@ class NodeIndexer:
         start: float,
         end: float,
     ) -> list[StoryNode]:
-        project = await _load_project(project_id)
-        if not project:
+        lookup = await _load_node_lookup(project_id)
+        if not lookup:
             return []
-        return [
-            node
-            for node in project.nodes
-            if start <= node.timeline_order <= end
+        return lookup.timeline_nodes[
+            bisect_left(lookup.timeline, start) : bisect_right(lookup.timeline, end)
         ]
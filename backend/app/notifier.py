@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
+import orjson
+
 from .websocket_manager import ConnectionManager, WSMessageType
 
 
+SYNC_PROGRESS_BATCH_SIZE = 16
+SYNC_PROGRESS_WINDOW_SECONDS = 0.1
+SYNC_LIFECYCLE_STATUSES = frozenset({"started", "completed", "failed"})
+
+
 class EventNotifier:
     def __init__(self, manager: ConnectionManager) -> None:
         self._manager = manager
+        self._progress_buffers: dict[str, list[dict]] = {}
+        self._progress_full: dict[str, asyncio.Event] = {}
+        self._progress_tasks: dict[str, asyncio.Task] = {}
 
     async def notify_node_updated(
         self, project_id: str, node: dict, updated_by: str
@@ -27,6 +38,45 @@ class EventNotifier:
             {"sync_result": sync_result},
         )
 
+    async def notify_node_updated_raw(
+        self, project_id: str, node_json: str, updated_by: str
+    ) -> None:
+        await self._manager.broadcast_raw_to_project(
+            project_id, self.node_updated_message(node_json, updated_by)
+        )
+
+    async def notify_graph_updated_raw(
+        self, project_id: str, sync_result_json: str
+    ) -> None:
+        await self._manager.broadcast_raw_to_project(
+            project_id, self.graph_updated_message(sync_result_json)
+        )
+
+    async def notify_many_raw(self, project_id: str, messages: list[str]) -> None:
+        await self._manager.broadcast_many_raw_to_project(project_id, messages)
+
+    @staticmethod
+    def node_updated_message(node_json: str, updated_by: str) -> str:
+        return '{"type":"%s","payload":{"node":%s,"updated_by":%s}}' % (
+            WSMessageType.NODE_UPDATED.value,
+            node_json,
+            orjson.dumps(updated_by).decode(),
+        )
+
+    @staticmethod
+    def graph_updated_message(sync_result_json: str) -> str:
+        return '{"type":"%s","payload":{"sync_result":%s}}' % (
+            WSMessageType.GRAPH_UPDATED.value,
+            sync_result_json,
+        )
+
+    @staticmethod
+    def conflict_detected_message(conflicts_json: str) -> str:
+        return '{"type":"%s","payload":{"conflicts":%s}}' % (
+            WSMessageType.CONFLICT_DETECTED.value,
+            conflicts_json,
+        )
+
     async def notify_conflict_detected(
         self, project_id: str, conflicts: list[dict]
     ) -> None:
@@ -36,16 +86,68 @@ class EventNotifier:
             {"conflicts": conflicts},
         )
 
+    async def notify_conflict_detected_raw(
+        self, project_id: str, conflicts_json: str
+    ) -> None:
+        await self._manager.broadcast_raw_to_project(
+            project_id, self.conflict_detected_message(conflicts_json)
+        )
+
     async def notify_sync_progress(
         self, project_id: str, status: str, details: dict | None = None
     ) -> None:
-        message_type = WSMessageType.SYNC_COMPLETED
-        if status == "started":
-            message_type = WSMessageType.SYNC_STARTED
-        elif status == "failed":
-            message_type = WSMessageType.SYNC_FAILED
+        await self._drain_sync_progress(project_id)
         await self._manager.broadcast_to_project(
             project_id,
-            message_type,
+            self._sync_message_type(status),
             {"status": status, "details": details or {}},
         )
+
+    async def notify_sync_progress_batched(
+        self, project_id: str, status: str, details: dict | None = None
+    ) -> None:
+        if status in SYNC_LIFECYCLE_STATUSES:
+            await self.notify_sync_progress(project_id, status, details)
+            return
+        buffer = self._progress_buffers.setdefault(project_id, [])
+        buffer.append(
+            {
+                "type": WSMessageType.SYNC_PROGRESS.value,
+                "payload": {"status": status, "details": details or {}},
+            }
+        )
+        full = self._progress_full.setdefault(project_id, asyncio.Event())
+        if len(buffer) >= SYNC_PROGRESS_BATCH_SIZE:
+            full.set()
+        task = self._progress_tasks.get(project_id)
+        if task is None or task.done():
+            self._progress_tasks[project_id] = asyncio.create_task(
+                self._flush_sync_progress(project_id)
+            )
+
+    async def _flush_sync_progress(self, project_id: str) -> None:
+        full = self._progress_full[project_id]
+        while self._progress_buffers.get(project_id):
+            try:
+                await asyncio.wait_for(full.wait(), timeout=SYNC_PROGRESS_WINDOW_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            full.clear()
+            await self._drain_sync_progress(project_id)
+
+    async def _drain_sync_progress(self, project_id: str) -> None:
+        events = self._progress_buffers.pop(project_id, None)
+        if events:
+            await self._manager.broadcast_to_project(
+                project_id,
+                WSMessageType.SYNC_PROGRESS,
+                {"events": events},
+            )
+
+    @staticmethod
+    def _sync_message_type(status: str) -> WSMessageType:
+        if status == "started":
+            return WSMessageType.SYNC_STARTED
+        if status == "failed":
+            return WSMessageType.SYNC_FAILED
+        return WSMessageType.SYNC_COMPLETED
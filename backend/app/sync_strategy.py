@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime
+import time
+from dataclasses import dataclass
 from enum import Enum
 
 from pydantic import BaseModel
 
 from .graph_extractor import GraphExtractor
 from .index_sync import IndexSyncManager, SyncResult
-from .knowledge_graph import load_graph, save_graph
+from .knowledge_graph import get_project_lock, load_graph, save_graph
 from .models import StoryNode
 from .node_indexer import NodeIndexer
 from .world_knowledge import WorldKnowledgeManager
@@ -29,6 +30,13 @@ class SyncConfig(BaseModel):
     batch_timeout_seconds: int = 60
 
 
+@dataclass(slots=True)
+class SyncEntry:
+    node: StoryNode
+    old_node: StoryNode | None
+    ts: float
+
+
 class SyncQueue:
     def __init__(
         self,
@@ -37,88 +45,116 @@ class SyncQueue:
     ):
         self.config = config
         self.index_sync_manager = index_sync_manager
-        self.pending_updates: dict[str, dict[str, StoryNode]] = {}
-        self.pending_old_nodes: dict[str, dict[str, StoryNode | None]] = {}
-        self.last_update_time: dict[str, dict[str, datetime]] = {}
+        self._entries: dict[tuple[str, str], SyncEntry] = {}
+        self._by_project: dict[str, set[str]] = {}
         self._lock = asyncio.Lock()
 
+    def pending_project_ids(self) -> list[str]:
+        return list(self._by_project)
+
     async def enqueue(
         self,
         project_id: str,
         node: StoryNode,
         old_node: StoryNode | None = None,
     ) -> None:
-        self.pending_updates.setdefault(project_id, {})[node.id] = node
-        old_nodes = self.pending_old_nodes.setdefault(project_id, {})
-        if node.id not in old_nodes or old_node is not None:
-            old_nodes[node.id] = old_node
-        self.last_update_time.setdefault(project_id, {})[node.id] = datetime.utcnow()
+        key = (project_id, node.id)
+        previous = self._entries.get(key)
+        if previous is not None and old_node is None:
+            old_node = previous.old_node
+        self._entries[key] = SyncEntry(node, old_node, time.monotonic())
+        self._by_project.setdefault(project_id, set()).add(node.id)
+
+    def _take_entries(self, project_id: str, node_ids: list[str]) -> list[SyncEntry]:
+        node_set = self._by_project.get(project_id)
+        taken: list[SyncEntry] = []
+        for node_id in node_ids:
+            entry = self._entries.pop((project_id, node_id), None)
+            if node_set is not None:
+                node_set.discard(node_id)
+            if entry is not None:
+                taken.append(entry)
+        if not node_set:
+            self._by_project.pop(project_id, None)
+        taken.sort(key=lambda entry: entry.ts)
+        return taken
+
+    async def _sync_entries(
+        self, project_id: str, entries: list[SyncEntry]
+    ) -> list[tuple[StoryNode, SyncResult]]:
+        _indexed, project_results = await asyncio.gather(
+            self.index_sync_manager.node_indexer.batch_index_nodes(
+                project_id, [entry.node for entry in entries]
+            ),
+            self._sync_graph(project_id, entries),
+        )
+        return project_results
+
+    async def _sync_graph(
+        self, project_id: str, entries: list[SyncEntry]
+    ) -> list[tuple[StoryNode, SyncResult]]:
+        async with get_project_lock(project_id):
+            current_graph = await asyncio.to_thread(load_graph, project_id)
+            results = await self.index_sync_manager.sync_node_updates(
+                project_id=project_id,
+                updates=[(entry.old_node, entry.node) for entry in entries],
+                current_graph=current_graph,
+            )
+            save_graph(current_graph)
+        return [(entry.node, result) for entry, result in zip(entries, results)]
 
     async def process_ready(self, project_id: str | None = None) -> list[SyncResult]:
+        processed = await self.process_ready_nodes(project_id)
+        return [
+            result
+            for project_results in processed.values()
+            for _node, result in project_results
+        ]
+
+    async def process_ready_nodes(
+        self, project_id: str | None = None
+    ) -> dict[str, list[tuple[StoryNode, SyncResult]]]:
         if self.config.graph_sync_mode not in (SyncMode.DEBOUNCED, SyncMode.BATCH):
-            return []
+            return {}
         if not self.index_sync_manager:
             raise RuntimeError("IndexSyncManager is required to process sync queue")
 
         async with self._lock:
-            results: list[SyncResult] = []
-            now = datetime.utcnow()
-            project_ids = (
-                [project_id]
-                if project_id
-                else list(self.pending_updates.keys())
-            )
+            results: dict[str, list[tuple[StoryNode, SyncResult]]] = {}
+            now = time.monotonic()
+            project_ids = [project_id] if project_id else list(self._by_project)
 
             for active_project_id in project_ids:
-                pending = self.pending_updates.get(active_project_id, {})
-                if not pending:
+                node_ids = self._by_project.get(active_project_id)
+                if not node_ids:
                     continue
 
                 ready_node_ids: list[str] = []
-                last_updates = self.last_update_time.get(active_project_id, {})
-
                 if self.config.graph_sync_mode == SyncMode.BATCH:
-                    oldest = min(last_updates.values()) if last_updates else now
-                    batch_ready = len(pending) >= self.config.batch_size
-                    timeout_ready = (
-                        (now - oldest).total_seconds() >= self.config.batch_timeout_seconds
+                    oldest = min(
+                        self._entries[(active_project_id, node_id)].ts
+                        for node_id in node_ids
                     )
+                    batch_ready = len(node_ids) >= self.config.batch_size
+                    timeout_ready = now - oldest >= self.config.batch_timeout_seconds
                     if batch_ready or timeout_ready:
-                        ready_node_ids = list(pending.keys())
+                        ready_node_ids = list(node_ids)
                 else:
-                    for node_id, update_time in list(last_updates.items()):
-                        if (now - update_time).total_seconds() >= self.config.debounce_seconds:
-                            ready_node_ids.append(node_id)
+                    ready_node_ids = [
+                        node_id
+                        for node_id in node_ids
+                        if now - self._entries[(active_project_id, node_id)].ts
+                        >= self.config.debounce_seconds
+                    ]
 
                 if not ready_node_ids:
                     continue
 
-                current_graph = load_graph(active_project_id)
-                project_results: list[SyncResult] = []
-                for node_id in ready_node_ids:
-                    node = pending.pop(node_id, None)
-                    old_node = self.pending_old_nodes.get(active_project_id, {}).pop(
-                        node_id, None
+                entries = self._take_entries(active_project_id, ready_node_ids)
+                if entries:
+                    results[active_project_id] = await self._sync_entries(
+                        active_project_id, entries
                     )
-                    last_updates.pop(node_id, None)
-                    if node is None:
-                        continue
-                    result = await self.index_sync_manager.sync_node_update(
-                        project_id=active_project_id,
-                        old_node=old_node,
-                        new_node=node,
-                        current_graph=current_graph,
-                    )
-                    project_results.append(result)
-
-                if project_results:
-                    save_graph(current_graph)
-                    results.extend(project_results)
-
-                if not pending:
-                    self.pending_updates.pop(active_project_id, None)
-                    self.pending_old_nodes.pop(active_project_id, None)
-                    self.last_update_time.pop(active_project_id, None)
 
             return results
 
@@ -129,27 +165,18 @@ class SyncQueue:
             raise RuntimeError("IndexSyncManager is required to process sync queue")
 
         async with self._lock:
-            pending = self.pending_updates.get(project_id, {})
-            if not pending:
+            node_ids = self._by_project.get(project_id)
+            if not node_ids:
                 return []
 
-            current_graph = load_graph(project_id)
-            results: list[SyncResult] = []
-            for node_id, node in list(pending.items()):
-                old_node = self.pending_old_nodes.get(project_id, {}).get(node_id)
-                result = await self.index_sync_manager.sync_node_update(
-                    project_id=project_id,
-                    old_node=old_node,
-                    new_node=node,
-                    current_graph=current_graph,
-                )
-                results.append(result)
-
-            save_graph(current_graph)
-            self.pending_updates.pop(project_id, None)
-            self.pending_old_nodes.pop(project_id, None)
-            self.last_update_time.pop(project_id, None)
-            return results
+            flushed_ids = list(node_ids)
+            entries = sorted(
+                (self._entries[(project_id, node_id)] for node_id in flushed_ids),
+                key=lambda entry: entry.ts,
+            )
+            project_results = await self._sync_entries(project_id, entries)
+            self._take_entries(project_id, flushed_ids)
+            return [result for _node, result in project_results]
 
 
 DEFAULT_SYNC_CONFIG = SyncConfig()
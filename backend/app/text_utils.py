@@ -1,6 +1,15 @@
 from __future__ import annotations
 
 import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import StoryNode
+
+
+NODE_TEXT_CACHE_SIZE = 128
+_node_text_cache: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
 
 
 def tokenize(text: str) -> list[str]:
@@ -17,3 +26,20 @@ def keyword_score(query_tokens: list[str], text: str) -> int:
         return 0
     text_tokens = set(tokenize(text))
     return len(text_tokens.intersection(query_tokens))
+
+
+def node_text(node: StoryNode) -> str:
+    title_hash = hash(node.title)
+    content_hash = hash(node.content)
+    cached = _node_text_cache.get(node.id)
+    if cached is not None and cached[0] == title_hash and cached[1] == content_hash:
+        _node_text_cache.move_to_end(node.id)
+        return cached[2]
+    title = node.title.strip()
+    content = node.content.strip()
+    text = f"{title}\n\n{content}" if title and content else title or content
+    _node_text_cache[node.id] = (title_hash, content_hash, text)
+    _node_text_cache.move_to_end(node.id)
+    while len(_node_text_cache) > NODE_TEXT_CACHE_SIZE:
+        _node_text_cache.popitem(last=False)
+    return text
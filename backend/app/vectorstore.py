@@ -74,6 +74,23 @@ async def add_documents(
     )
 
 
+async def upsert_documents(
+    collection_name: str,
+    documents: list[str],
+    metadatas: list[dict],
+    ids: list[str],
+) -> None:
+    if not (len(documents) == len(metadatas) == len(ids)):
+        raise ValueError("documents, metadatas, and ids must have the same length")
+    collection = _get_collection(collection_name)
+    await asyncio.to_thread(
+        collection.upsert,
+        documents=documents,
+        metadatas=metadatas,
+        ids=ids,
+    )
+
+
 async def search_similar(
     collection_name: str,
     query: str,
@@ -181,25 +181,15 @@ class VersionManager:
         for snapshot in snapshots:
             await self._storage.save_snapshot(snapshot)
 
-    async def create_pre_sync_snapshot_if_needed(
+    def needs_pre_sync_snapshot(
         self,
-        project: StoryProject,
         old_node: StoryNode | None,
         new_node: StoryNode,
     ) -> bool:
         if not old_node:
             return False
         change_size = abs(len(old_node.content) - len(new_node.content))
-        if change_size < self._config.major_change_threshold:
-            return False
-        graph = load_graph(project.id)
-        await self.create_snapshot(
-            project,
-            graph,
-            SnapshotType.PRE_SYNC,
-            name="Pre-sync backup",
-        )
-        return True
+        return change_size >= self._config.major_change_threshold
 
     async def update_version_metadata(
         self,
@@ -251,7 +241,7 @@ class VersionManager:
                 project = await get_project(session, summary.id)
                 if not project:
                     continue
-                graph = load_graph(project.id)
+                graph = await asyncio.to_thread(load_graph, project.id, False)
                 await self.create_snapshot(project, graph, SnapshotType.AUTO)
 
     @staticmethod
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import gzip
 import json
 import shutil
@@ -29,8 +30,7 @@ class VersionStorage:
         path = self._snapshot_path(snapshot.story_project.id, snapshot.version)
         temp_path = path.with_suffix(".json.tmp")
         payload = snapshot.model_dump(mode="json")
-        temp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        temp_path.replace(path)
+        await asyncio.to_thread(self._write_snapshot, path, temp_path, payload)
 
         async with AsyncSessionLocal() as session:
             record_data = {
@@ -60,8 +60,17 @@ class VersionStorage:
             await session.execute(stmt)
             await session.commit()
 
+    @staticmethod
+    def _write_snapshot(path: Path, temp_path: Path, payload: dict) -> None:
+        temp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        temp_path.replace(path)
+
     async def load_snapshot(self, project_id: str, version: int) -> IndexSnapshot:
         path = self._snapshot_path(project_id, version)
+        return await asyncio.to_thread(self._read_snapshot, path)
+
+    @staticmethod
+    def _read_snapshot(path: Path) -> IndexSnapshot:
         if not path.exists():
             compressed = path.with_suffix(".json.gz")
             if not compressed.exists():
@@ -99,11 +108,7 @@ class VersionStorage:
 
     async def delete_snapshot(self, project_id: str, version: int) -> None:
         path = self._snapshot_path(project_id, version)
-        compressed = path.with_suffix(".json.gz")
-        if path.exists():
-            path.unlink()
-        if compressed.exists():
-            compressed.unlink()
+        await asyncio.to_thread(self._remove_snapshot_files, path)
 
         async with AsyncSessionLocal() as session:
             await session.execute(
@@ -114,6 +119,11 @@ class VersionStorage:
             )
             await session.commit()
 
+    @staticmethod
+    def _remove_snapshot_files(path: Path) -> None:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json.gz").unlink(missing_ok=True)
+
     async def compress_old_snapshots(self, project_id: str, older_than_days: int) -> int:
         cutoff = datetime.utcnow() - timedelta(days=older_than_days)
         async with AsyncSessionLocal() as session:
@@ -127,19 +137,27 @@ class VersionStorage:
             records = result.scalars().all()
             compressed_count = 0
             for record in records:
-                path = Path(record.file_path)
-                if not path.exists():
+                compressed_path = await asyncio.to_thread(
+                    self._compress_file, Path(record.file_path)
+                )
+                if compressed_path is None:
                     continue
-                compressed_path = path.with_suffix(".json.gz")
-                with path.open("rb") as src, gzip.open(compressed_path, "wb") as dst:
-                    dst.write(src.read())
-                path.unlink()
                 record.file_path = str(compressed_path)
                 record.is_compressed = True
                 compressed_count += 1
             await session.commit()
             return compressed_count
 
+    @staticmethod
+    def _compress_file(path: Path) -> Path | None:
+        if not path.exists():
+            return None
+        compressed_path = path.with_suffix(".json.gz")
+        with path.open("rb") as src, gzip.open(compressed_path, "wb") as dst:
+            dst.write(src.read())
+        path.unlink()
+        return compressed_path
+
     async def update_snapshot_metadata(
         self,
         project_id: str,
@@ -157,15 +175,8 @@ class VersionStorage:
             snapshot.snapshot_type = snapshot.snapshot_type.__class__(snapshot_type)
 
         path = self._snapshot_path(project_id, version)
-        compressed = path.with_suffix(".json.gz")
         payload = snapshot.model_dump(mode="json")
-        if compressed.exists():
-            with gzip.open(compressed, "wt", encoding="utf-8") as handle:
-                json.dump(payload, handle, ensure_ascii=False, indent=2)
-        else:
-            path.write_text(
-                json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
-            )
+        await asyncio.to_thread(self._rewrite_snapshot, path, payload)
 
         async with AsyncSessionLocal() as session:
             await session.execute(
@@ -183,6 +194,17 @@ class VersionStorage:
             await session.commit()
         return snapshot
 
+    @staticmethod
+    def _rewrite_snapshot(path: Path, payload: dict) -> None:
+        compressed = path.with_suffix(".json.gz")
+        if compressed.exists():
+            with gzip.open(compressed, "wt", encoding="utf-8") as handle:
+                json.dump(payload, handle, ensure_ascii=False, indent=2)
+        else:
+            path.write_text(
+                json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+
     async def delete_project_data(self, project_id: str) -> None:
         async with AsyncSessionLocal() as session:
             result = await session.execute(
@@ -194,11 +216,15 @@ class VersionStorage:
             )
             await session.commit()
 
-        for record in records:
-            path = Path(record.file_path)
-            if path.exists():
-                path.unlink()
+        await asyncio.to_thread(
+            self._remove_project_files,
+            [Path(record.file_path) for record in records],
+            self._base_dir / project_id,
+        )
 
-        project_dir = self._base_dir / project_id
+    @staticmethod
+    def _remove_project_files(paths: list[Path], project_dir: Path) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
         if project_dir.exists():
             shutil.rmtree(project_dir, ignore_errors=True)
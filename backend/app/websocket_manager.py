@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from enum import Enum
 
+import orjson
 from fastapi import WebSocket
 
+BROADCAST_SEND_TIMEOUT_SECONDS = 5
+
 
 class WSMessageType(str, Enum):
     NODE_UPDATED = "node_updated"
@@ -14,6 +18,7 @@ class WSMessageType(str, Enum):
     SYNC_STARTED = "sync_started"
     SYNC_COMPLETED = "sync_completed"
     SYNC_FAILED = "sync_failed"
+    SYNC_PROGRESS = "sync_progress"
     PING = "ping"
     PONG = "pong"
 
@@ -40,12 +45,69 @@ class ConnectionManager:
         message_type: WSMessageType | str,
         payload: dict | None = None,
     ) -> None:
-        connections = list(self._connections.get(project_id, set()))
-        if not connections:
+        if project_id not in self._connections:
             return
-        message = {"type": str(message_type), "payload": payload or {}}
+        message = orjson.dumps(
+            {"type": str(message_type), "payload": payload or {}}
+        ).decode()
+        await self.broadcast_raw_to_project(project_id, message)
+
+    async def broadcast_raw_to_project(self, project_id: str, message: str) -> None:
+        connections = list(self._connections.get(project_id, set()))
         for websocket in connections:
             try:
-                await websocket.send_json(message)
+                await websocket.send_text(message)
             except Exception:
                 self.disconnect(project_id, websocket)
+
+    async def broadcast_many_raw_to_project(
+        self, project_id: str, messages: list[str]
+    ) -> None:
+        connections = list(self._connections.get(project_id, set()))
+        if not connections or not messages:
+            return
+
+        async def send_all(websocket: WebSocket) -> None:
+            for message in messages:
+                await websocket.send_text(message)
+
+        results = await asyncio.gather(
+            *(send_all(websocket) for websocket in connections),
+            return_exceptions=True,
+        )
+        for websocket, outcome in zip(connections, results):
+            if isinstance(outcome, Exception):
+                self.disconnect(project_id, websocket)
+
+    async def broadcast_all(
+        self,
+        message_type: WSMessageType | str,
+        payload: dict | None = None,
+    ) -> None:
+        if not self._connections:
+            return
+        message = orjson.dumps(
+            {"type": str(message_type), "payload": payload or {}}
+        ).decode()
+        await self.broadcast_raw_all(message)
+
+    async def broadcast_raw_all(self, message: str) -> None:
+        targets = [
+            (project_id, websocket)
+            for project_id, connections in self._connections.items()
+            for websocket in connections
+        ]
+        if not targets:
+            return
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    websocket.send_text(message), BROADCAST_SEND_TIMEOUT_SECONDS
+                )
+                for _, websocket in targets
+            ),
+            return_exceptions=True,
+        )
+        for (project_id, websocket), outcome in zip(targets, results):
+            if isinstance(outcome, Exception):
+                self.disconnect(project_id, websocket)
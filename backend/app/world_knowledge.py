@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from contextlib import contextmanager
 import fcntl
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import AsyncIterator
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
@@ -73,6 +75,14 @@ def _load_project_documents(project_id: str) -> list[WorldDocument]:
         return [WorldDocument.model_validate(item) for item in data]
 
 
+def _documents_signature(project_id: str) -> tuple[int, int] | None:
+    try:
+        stat = _project_file(project_id).stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 def _save_project_documents(project_id: str, documents: list[WorldDocument]) -> None:
     path = _project_file(project_id)
     payload = [doc.model_dump(mode="json") for doc in documents]
@@ -132,6 +142,17 @@ def _split_markdown_sections(markdown_content: str) -> list[tuple[str, str]]:
     return [(title, "\n".join(body).strip()) for title, body in sections]
 
 
+async def _iter_lines(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    pending = ""
+    async for chunk in chunks:
+        lines = (pending + chunk).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        for line in lines:
+            yield line.rstrip("\r\n")
+    for line in pending.splitlines():
+        yield line
+
+
 def _build_snippet(document: WorldDocument, limit: int = 180) -> str:
     content = document.content.strip().replace("\n", " ")
     if len(content) > limit:
@@ -139,10 +160,22 @@ def _build_snippet(document: WorldDocument, limit: int = 180) -> str:
     return f"{document.title}（{document.category}）：{content}"
 
 
+@dataclass
+class WorldWriteOp:
+    project_id: str
+    title: str
+    category: str
+    content: str
+    chunking_config: ChunkConfig | None = None
+
+
 class WorldKnowledgeManager:
     async def list_project_documents(self, project_id: str) -> list[WorldDocument]:
         return _load_project_documents(project_id)
 
+    def documents_signature(self, project_id: str) -> tuple[int, int] | None:
+        return _documents_signature(project_id)
+
     async def add_document(
         self,
         project_id: str,
@@ -151,45 +184,64 @@ class WorldKnowledgeManager:
         content: str,
         chunking_config: ChunkConfig | None = None,
     ) -> WorldDocument:
-        config = chunking_config or _default_chunking_config()
-        document = WorldDocument(
-            id=str(uuid4()),
-            project_id=project_id,
-            title=title,
-            category=category,
-            content=content,
-            chunks=[],
-            created_at=_now(),
-            updated_at=_now(),
+        documents = await self.add_documents_bulk(
+            [WorldWriteOp(project_id, title, category, content, chunking_config)]
         )
+        return documents[0]
 
-        chunks = chunk_text(
-            content,
-            config,
-            source_metadata={"project_id": project_id, "document_id": document.id},
-        )
-        if chunks:
+    async def add_documents_bulk(self, ops: list[WorldWriteOp]) -> list[WorldDocument]:
+        documents: list[WorldDocument] = []
+        chunk_contents: list[str] = []
+        chunk_metadatas: list[dict] = []
+        chunk_ids: list[str] = []
+        for op in ops:
+            config = op.chunking_config or _default_chunking_config()
+            document = WorldDocument(
+                id=str(uuid4()),
+                project_id=op.project_id,
+                title=op.title,
+                category=op.category,
+                content=op.content,
+                chunks=[],
+                created_at=_now(),
+                updated_at=_now(),
+            )
+            chunks = chunk_text(
+                op.content,
+                config,
+                source_metadata={"project_id": op.project_id, "document_id": document.id},
+            )
             document.chunks = [chunk.id for chunk in chunks]
-            await add_documents(
-                collection_name="world_knowledge",
-                documents=[chunk.content for chunk in chunks],
-                metadatas=[
+            for index, chunk in enumerate(chunks):
+                chunk_contents.append(chunk.content)
+                chunk_metadatas.append(
                     _build_chunk_metadata(
-                        project_id,
+                        op.project_id,
                         document,
                         index,
                         chunk.start_index,
                         chunk.end_index,
                     )
-                    for index, chunk in enumerate(chunks)
-                ],
-                ids=[chunk.id for chunk in chunks],
+                )
+                chunk_ids.append(chunk.id)
+            documents.append(document)
+
+        if chunk_ids:
+            await add_documents(
+                collection_name="world_knowledge",
+                documents=chunk_contents,
+                metadatas=chunk_metadatas,
+                ids=chunk_ids,
             )
 
-        documents = _load_project_documents(project_id)
-        documents.append(document)
-        _save_project_documents(project_id, documents)
-        return document
+        by_project: dict[str, list[WorldDocument]] = {}
+        for document in documents:
+            by_project.setdefault(document.project_id, []).append(document)
+        for project_id, added in by_project.items():
+            stored = _load_project_documents(project_id)
+            stored.extend(added)
+            _save_project_documents(project_id, stored)
+        return documents
 
     async def update_document(
         self,
@@ -462,6 +514,43 @@ class WorldKnowledgeManager:
         _save_project_documents(project_id, restored)
         return restored
 
+    async def import_from_markdown_stream(
+        self,
+        project_id: str,
+        chunks: AsyncIterator[str],
+    ) -> list[WorldDocument]:
+        documents: list[WorldDocument] = []
+        current_title = "未命名世界观"
+        current_lines: list[str] = []
+
+        async def add_section() -> None:
+            content = "\n".join(current_lines).strip()
+            if not content:
+                return
+            document = await self.add_document(
+                project_id=project_id,
+                title=current_title,
+                category="general",
+                content=content,
+            )
+            documents.append(document)
+
+        try:
+            async for line in _iter_lines(chunks):
+                if line.startswith("# "):
+                    if current_lines:
+                        await add_section()
+                        current_lines = []
+                    current_title = line[2:].strip() or "未命名世界观"
+                else:
+                    current_lines.append(line)
+            await add_section()
+        except BaseException:
+            for document in documents:
+                await self.delete_document_in_project(project_id, document.id)
+            raise
+        return documents
+
     async def import_from_markdown(
         self,
         project_id: str,
@@ -483,3 +572,61 @@ class WorldKnowledgeManager:
             )
             documents.append(document)
         return documents
+
+
+class WorldWriteQueue:
+    def __init__(
+        self,
+        manager: WorldKnowledgeManager,
+        batch_size: int = 32,
+        batch_timeout_seconds: float = 0.05,
+    ):
+        self.manager = manager
+        self.batch_size = batch_size
+        self.batch_timeout_seconds = batch_timeout_seconds
+        self._queue: asyncio.Queue[tuple[WorldWriteOp, asyncio.Future]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    async def submit(self, op: WorldWriteOp) -> WorldDocument:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_timeout_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[WorldWriteOp, asyncio.Future]]) -> None:
+        try:
+            documents = await self.manager.add_documents_bulk([op for op, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), document in zip(batch, documents):
+            if not future.done():
+                future.set_result(document)
@@ -0,0 +1,149 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from app import knowledge_graph as kg
+from app.knowledge_graph import Entity, GraphDelta, KnowledgeGraph
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(kg, "_storage_dir", lambda: tmp_path)
+    monkeypatch.setattr(kg, "_graph_cache", OrderedDict())
+    monkeypatch.setattr(kg, "_dirty_graphs", set())
+    monkeypatch.setattr(kg, "_evicted_graphs", {})
+    monkeypatch.setattr(kg, "_graph_versions", {})
+    monkeypatch.setattr(kg, "_graph_mtimes", {})
+    monkeypatch.setattr(kg, "_journal_seqs", {})
+    monkeypatch.setattr(kg, "_journal_pending", {})
+    monkeypatch.setattr(kg, "_graph_generations", {})
+    monkeypatch.setattr(kg, "_flush_task", None)
+    monkeypatch.setattr(kg, "_flush_loop", None)
+    monkeypatch.setattr(kg, "_flush_lock", asyncio.Lock())
+    return tmp_path
+
+
+def _entity(entity_id: str, name: str) -> Entity:
+    return Entity(id=entity_id, name=name, type="character", description="")
+
+
+def _graph(project_id: str, *entities: Entity) -> KnowledgeGraph:
+    return KnowledgeGraph(
+        project_id=project_id,
+        entities=list(entities),
+        relations=[],
+        last_updated=kg.utc_now(),
+    )
+
+
+def _forget_cache() -> None:
+    kg._graph_cache.clear()
+    kg._dirty_graphs.clear()
+    kg._evicted_graphs.clear()
+    kg._graph_mtimes.clear()
+    kg._journal_seqs.clear()
+    kg._journal_pending.clear()
+
+
+def _journal_edit(project_id: str, entity: Entity) -> None:
+    graph = kg.load_graph(project_id)
+    graph.add_items([entity])
+    record = kg.save_graph_delta(graph, GraphDelta(entities=[entity]))
+    kg.write_graph_delta(project_id, record)
+
+
+def test_journal_is_replayed_after_crash_without_compaction():
+    kg._write_graph(_graph("p-1", _entity("e-1", "Alice")), 0)
+    _journal_edit("p-1", _entity("e-2", "Bob"))
+    _journal_edit("p-1", _entity("e-3", "Carol"))
+    _forget_cache()
+
+    graph = kg.load_graph("p-1")
+
+    assert [entity.id for entity in graph.entities] == ["e-1", "e-2", "e-3"]
+    assert kg._journal_seqs["p-1"] == 2
+    assert kg._journal_file("p-1").exists()
+
+
+def test_compaction_drops_only_records_up_to_flushed_seq():
+    kg._write_graph(_graph("p-1"), 0)
+    for seq in (1, 2, 3):
+        kg._append_journal(
+            "p-1",
+            {
+                "seq": seq,
+                "last_updated": kg.utc_now().isoformat(),
+                "entities": [_entity(f"e-{seq}", f"Entity {seq}").model_dump(mode="json")],
+                "removed_entities": [],
+                "relations": [],
+                "removed_relations": [],
+            },
+        )
+
+    kg._compact_journal("p-1", 2)
+
+    assert [record["seq"] for record in kg._read_journal("p-1", 0)] == [3]
+    graph, journal_seq = kg._read_graph("p-1")
+    assert [entity.id for entity in graph.entities] == ["e-3"]
+    assert journal_seq == 3
+
+
+def test_flush_writes_journal_seq_and_compacts_journal():
+    kg._write_graph(_graph("p-1"), 0)
+    _journal_edit("p-1", _entity("e-1", "Alice"))
+    kg._dirty_graphs.add("p-1")
+
+    asyncio.run(kg.flush_graphs())
+
+    assert not kg._journal_file("p-1").exists()
+    _forget_cache()
+    graph, journal_seq = kg._read_graph("p-1")
+    assert [entity.id for entity in graph.entities] == ["e-1"]
+    assert journal_seq == 1
+
+
+def test_evicted_dirty_graph_is_flushed_off_the_cache_lock(monkeypatch):
+    monkeypatch.setattr(kg, "_GRAPH_CACHE_SIZE", 1)
+
+    async def scenario():
+        kg.save_graph(_graph("p-1", _entity("e-1", "Alice")))
+        assert "p-1" in kg._dirty_graphs
+        kg.save_graph(_graph("p-2"))
+        assert "p-1" not in kg._graph_cache
+        assert not kg._graph_file("p-1").exists()
+        assert [entity.id for entity in kg.load_graph("p-1").entities] == ["e-1"]
+        kg._flush_task.cancel()
+        await kg.flush_graphs()
+        assert kg._graph_file("p-1").exists()
+        assert kg._evicted_graphs == {}
+
+    asyncio.run(scenario())
+    _forget_cache()
+    graph = kg.load_graph("p-1")
+    assert [entity.id for entity in graph.entities] == ["e-1"]
+
+
+def test_flush_taken_before_delete_does_not_recreate_graph():
+    async def scenario():
+        kg.save_graph(_graph("p-1", _entity("e-1", "Alice")))
+        kg._flush_task.cancel()
+
+    asyncio.run(scenario())
+    dirty = kg._take_dirty_graph()
+    kg.delete_graph("p-1")
+    kg._write_graph(*dirty)
+    assert not kg._graph_file("p-1").exists()
+    assert "p-1" not in kg._graph_mtimes
+
+
+def test_legacy_json_graph_is_read_and_replaced_on_write():
+    legacy = _graph("p-1", _entity("e-1", "Alice"))
+    kg._legacy_graph_file("p-1").write_text(legacy.model_dump_json(), encoding="utf-8")
+
+    graph = kg.load_graph("p-1")
+    assert [entity.id for entity in graph.entities] == ["e-1"]
+
+    kg._write_graph(graph, 0)
+    assert kg._graph_file("p-1").exists()
+    assert not kg._legacy_graph_file("p-1").exists()
@@ -0,0 +1,79 @@
+import asyncio
+
+from app import notifier as notifier_module
+from app.notifier import EventNotifier
+
+
+class RecordingManager:
+    def __init__(self) -> None:
+        self.frames: list[tuple[str, str, dict]] = []
+
+    async def broadcast_to_project(self, project_id, message_type, payload=None):
+        message_type = getattr(message_type, "value", message_type)
+        self.frames.append((project_id, message_type, payload or {}))
+
+
+def test_lifecycle_events_are_sent_as_their_own_frames():
+    async def scenario():
+        manager = RecordingManager()
+        notifier = EventNotifier(manager)
+        await notifier.notify_sync_progress_batched("p-1", "started", {"node_id": "n-1"})
+        await notifier.notify_sync_progress_batched("p-1", "completed", {"node_id": "n-1"})
+        return manager.frames
+
+    frames = asyncio.run(scenario())
+    assert frames == [
+        ("p-1", "sync_started", {"status": "started", "details": {"node_id": "n-1"}}),
+        ("p-1", "sync_completed", {"status": "completed", "details": {"node_id": "n-1"}}),
+    ]
+
+
+def test_progress_ticks_are_coalesced_within_the_window():
+    async def scenario():
+        manager = RecordingManager()
+        notifier = EventNotifier(manager)
+        for step in range(3):
+            await notifier.notify_sync_progress_batched("p-1", "indexing", {"step": step})
+        assert manager.frames == []
+        await asyncio.sleep(notifier_module.SYNC_PROGRESS_WINDOW_SECONDS * 3)
+        return manager.frames
+
+    frames = asyncio.run(scenario())
+    assert len(frames) == 1
+    project_id, message_type, payload = frames[0]
+    assert (project_id, message_type) == ("p-1", "sync_progress")
+    assert [event["payload"]["details"]["step"] for event in payload["events"]] == [0, 1, 2]
+    assert {event["type"] for event in payload["events"]} == {"sync_progress"}
+
+
+def test_progress_ticks_flush_once_batch_size_is_reached(monkeypatch):
+    monkeypatch.setattr(notifier_module, "SYNC_PROGRESS_WINDOW_SECONDS", 60)
+
+    async def scenario():
+        manager = RecordingManager()
+        notifier = EventNotifier(manager)
+        for step in range(notifier_module.SYNC_PROGRESS_BATCH_SIZE):
+            await notifier.notify_sync_progress_batched("p-1", "indexing", {"step": step})
+        await asyncio.sleep(0.05)
+        return manager.frames
+
+    frames = asyncio.run(scenario())
+    assert len(frames) == 1
+    assert len(frames[0][2]["events"]) == notifier_module.SYNC_PROGRESS_BATCH_SIZE
+
+
+def test_lifecycle_event_drains_pending_ticks_first(monkeypatch):
+    monkeypatch.setattr(notifier_module, "SYNC_PROGRESS_WINDOW_SECONDS", 60)
+
+    async def scenario():
+        manager = RecordingManager()
+        notifier = EventNotifier(manager)
+        await notifier.notify_sync_progress_batched("p-1", "indexing", {"step": 0})
+        await notifier.notify_sync_progress("p-1", "completed", {"node_id": "n-1"})
+        return manager.frames
+
+    frames = asyncio.run(scenario())
+    assert [message_type for _project_id, message_type, _payload in frames] == [
+        "sync_progress",
+        "sync_completed",
+    ]
@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+
+from app import sync_strategy
+from app.index_sync import IndexSyncManager, SyncResult
+from app.knowledge_graph import Entity, KnowledgeGraph, utc_now
+from app.models import StoryNode
+from app.sync_strategy import SyncConfig, SyncMode, SyncQueue
+
+
+class RecordingIndexer:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    async def batch_index_nodes(self, project_id, nodes):
+        self.batches.append([node.id for node in nodes])
+        return len(nodes)
+
+
+class RecordingSyncManager:
+    def __init__(self) -> None:
+        self.node_indexer = RecordingIndexer()
+        self.updates: list[tuple[str | None, str, str]] = []
+
+    async def sync_node_updates(self, project_id, updates, current_graph):
+        results = []
+        for old_node, new_node in updates:
+            self.updates.append(
+                (old_node.title if old_node else None, new_node.id, new_node.title)
+            )
+            results.append(SyncResult(success=True, vector_updated=True, graph_updated=True))
+        return results
+
+
+@pytest.fixture(autouse=True)
+def in_memory_graph(monkeypatch):
+    saved: list[object] = []
+    monkeypatch.setattr(sync_strategy, "load_graph", lambda project_id: object())
+    monkeypatch.setattr(sync_strategy, "save_graph", saved.append)
+    monkeypatch.setattr(sync_strategy, "get_project_lock", lambda project_id: asyncio.Lock())
+    return saved
+
+
+def _node(node_id: str, title: str) -> StoryNode:
+    return StoryNode(
+        id=node_id,
+        title=title,
+        content="",
+        narrative_order=1,
+        timeline_order=1.0,
+        location_tag="main",
+    )
+
+
+def _queue(**config) -> tuple[SyncQueue, RecordingSyncManager]:
+    manager = RecordingSyncManager()
+    return SyncQueue(SyncConfig(**config), index_sync_manager=manager), manager
+
+
+def _age(queue: SyncQueue, project_id: str, node_id: str, seconds: float) -> None:
+    queue._entries[(project_id, node_id)].ts -= seconds
+
+
+def test_enqueue_dedupes_by_node_and_keeps_first_old_node():
+    queue, manager = _queue(graph_sync_mode=SyncMode.DEBOUNCED, debounce_seconds=5)
+
+    async def scenario():
+        await queue.enqueue("p-1", _node("n-1", "v2"), old_node=_node("n-1", "v1"))
+        await queue.enqueue("p-1", _node("n-1", "v3"))
+        _age(queue, "p-1", "n-1", 10)
+        return await queue.process_ready_nodes()
+
+    processed = asyncio.run(scenario())
+    assert manager.updates == [("v1", "n-1", "v3")]
+    assert [node.title for node, _result in processed["p-1"]] == ["v3"]
+    assert queue.pending_project_ids() == []
+
+
+def test_debounce_only_releases_quiet_nodes(in_memory_graph):
+    queue, manager = _queue(graph_sync_mode=SyncMode.DEBOUNCED, debounce_seconds=5)
+
+    async def scenario():
+        await queue.enqueue("p-1", _node("n-1", "a"))
+        await queue.enqueue("p-1", _node("n-2", "b"))
+        assert await queue.process_ready_nodes("p-1") == {}
+        _age(queue, "p-1", "n-1", 10)
+        return await queue.process_ready_nodes("p-1")
+
+    processed = asyncio.run(scenario())
+    assert [node.id for node, _result in processed["p-1"]] == ["n-1"]
+    assert manager.node_indexer.batches == [["n-1"]]
+    assert len(in_memory_graph) == 1
+    assert queue.pending_project_ids() == ["p-1"]
+
+
+def test_batch_mode_waits_for_size_or_timeout():
+    queue, manager = _queue(
+        graph_sync_mode=SyncMode.BATCH, batch_size=3, batch_timeout_seconds=60
+    )
+
+    async def scenario():
+        await queue.enqueue("p-1", _node("n-1", "a"))
+        await queue.enqueue("p-1", _node("n-2", "b"))
+        assert await queue.process_ready_nodes("p-1") == {}
+        await queue.enqueue("p-1", _node("n-3", "c"))
+        by_size = await queue.process_ready_nodes("p-1")
+
+        await queue.enqueue("p-2", _node("n-4", "d"))
+        assert await queue.process_ready_nodes("p-2") == {}
+        _age(queue, "p-2", "n-4", 61)
+        by_timeout = await queue.process_ready_nodes("p-2")
+        return by_size, by_timeout
+
+    by_size, by_timeout = asyncio.run(scenario())
+    assert sorted(node.id for node, _result in by_size["p-1"]) == ["n-1", "n-2", "n-3"]
+    assert [node.id for node, _result in by_timeout["p-2"]] == ["n-4"]
+    assert len(manager.node_indexer.batches) == 2
+
+
+def test_flush_syncs_everything_pending_for_project():
+    queue, manager = _queue(graph_sync_mode=SyncMode.DEBOUNCED, debounce_seconds=5)
+
+    async def scenario():
+        await queue.enqueue("p-1", _node("n-1", "a"))
+        await queue.enqueue("p-1", _node("n-2", "b"))
+        await queue.enqueue("p-2", _node("n-3", "c"))
+        return await queue.flush("p-1")
+
+    results = asyncio.run(scenario())
+    assert len(results) == 2
+    assert [node_id for _old, node_id, _title in manager.updates] == ["n-1", "n-2"]
+    assert queue.pending_project_ids() == ["p-2"]
+
+
+def test_manual_mode_never_processes_queue():
+    queue, manager = _queue(graph_sync_mode=SyncMode.MANUAL)
+
+    async def scenario():
+        await queue.enqueue("p-1", _node("n-1", "a"))
+        return await queue.process_ready_nodes(), await queue.flush("p-1")
+
+    assert asyncio.run(scenario()) == ({}, [])
+    assert manager.updates == []
+
+
+class ConcurrentExtractor:
+    def __init__(self, expected: int) -> None:
+        self.expected = expected
+        self.started = 0
+        self.all_started = asyncio.Event()
+
+    async def incremental_update(self, project_id, modified_node, current_graph):
+        self.started += 1
+        if self.started == self.expected:
+            self.all_started.set()
+        await asyncio.wait_for(self.all_started.wait(), timeout=1)
+        entity = Entity(
+            id=f"e-{modified_node.id}",
+            name=modified_node.title,
+            type="character",
+            description="",
+        )
+        return KnowledgeGraph(
+            project_id=project_id,
+            entities=[*current_graph.entities, entity],
+            relations=list(current_graph.relations),
+            last_updated=utc_now(),
+        )
+
+
+def test_sync_node_updates_extracts_concurrently_and_merges_once():
+    extractor = ConcurrentExtractor(expected=2)
+    manager = IndexSyncManager(
+        node_indexer=None, graph_extractor=extractor, knowledge_manager=None
+    )
+    existing = Entity(id="e-0", name="Old", type="character", description="")
+    graph = KnowledgeGraph(
+        project_id="p-1", entities=[existing], relations=[], last_updated=utc_now()
+    )
+
+    results = asyncio.run(
+        manager.sync_node_updates(
+            "p-1", [(None, _node("n-1", "Ann")), (None, _node("n-2", "Bo"))], graph
+        )
+    )
+
+    assert [[entity.id for entity in result.new_entities] for result in results] == [
+        ["e-n-1"],
+        ["e-n-2"],
+    ]
+    assert [entity.id for entity in graph.entities] == ["e-0", "e-n-1", "e-n-2"]
+    assert graph.get_entity("e-n-2").name == "Bo"
@@ -0,0 +1,29 @@
+import asyncio
+
+from app import websocket_manager
+from app.websocket_manager import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self, stalled: bool = False) -> None:
+        self.stalled = stalled
+        self.sent: list[str] = []
+
+    async def send_text(self, message: str) -> None:
+        if self.stalled:
+            await asyncio.sleep(3600)
+        self.sent.append(message)
+
+
+def test_stalled_socket_is_dropped_without_blocking_other_pings(monkeypatch):
+    monkeypatch.setattr(websocket_manager, "BROADCAST_SEND_TIMEOUT_SECONDS", 0.05)
+    manager = ConnectionManager()
+    healthy, stalled = FakeSocket(), FakeSocket(stalled=True)
+    manager._connections = {"p-1": {healthy}, "p-2": {stalled}}
+
+    async def scenario():
+        await asyncio.wait_for(manager.broadcast_raw_all("ping"), timeout=1)
+
+    asyncio.run(scenario())
+    assert healthy.sent == ["ping"]
+    assert manager._connections == {"p-1": {healthy}}
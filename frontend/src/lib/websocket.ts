@@ -47,6 +47,13 @@ export class WebSocketClient {
           this.send({ type: "pong", payload: {} })
           return
         }
+        if (message.type === "sync_progress") {
+          const { events } = (message.payload ?? {}) as {
+            events?: { type: string; payload?: unknown }[]
+          }
+          events?.forEach((event) => this.emit(event.type, event.payload))
+          return
+        }
         this.emit(message.type, message.payload)
       } catch {
         // ignore malformed messages